@@ -22,11 +22,18 @@ import platform
 import subprocess
 import importlib.metadata as meta
 import logging
+import threading
 
 import ctypes as ct
 import ctypes.util
 import ast
+import bisect
+import collections.abc
+import functools
+import hashlib
+import html
 import json
+import mmap
 import math, cmath, re, random, time
 
 import obspython as obs
@@ -52,43 +59,83 @@ print(f"adv-ff starting load of version {('.').join((str(n) for _, n in version.
 
 
 
-try:
-    pyp_version = meta.version("pyparsing")
-    if int(pyp_version[0]) >= 3:
-        import pyparsing as pp
-        print(f"Found pyparsing {pyp_version}")
-        pyp_satisfied = True
-    else:
-        print(f"Pyparsing outdated : found {pyp_version}, requires 3.0")
-        pyp_satisfied = False
-except (meta.PackageNotFoundError, ModuleNotFoundError):
-    print("Pyparsing not found")
-    pyp_satisfied = False
+class Startup():
+    """ Durations of the stages of the script's load, reported once it is done
+    """
+    stages  = {}
+    last    = time.perf_counter()
 
+    def mark(self, stage):
+        now = time.perf_counter()
+        self.stages[stage] = now - self.last
+        self.last = now
 
-if not pyp_satisfied:
-    print("Pyparsing requirements not satisfied, attempting pip install")
-    options = ['--target', sys.path[-1]]
+    def report(self):
+        return ", ".join(f"{stage} {duration * 1000:.1f}ms" for stage, duration in self.stages.items())
 
-    if platform.system() == "Windows":
-        py_executable = [os.path.join(sys.exec_prefix, "python")]
-    elif platform.system() == "Darwin":
-        py_executable = [os.path.join(sys.exec_prefix, f"bin/python{sys.version_info[0]}.{sys.version_info[1]}")]
-    else:
-        py_executable = [f"python{sys.version_info[0]}.{sys.version_info[1]}"]    # No, sys.executable is not trustworthy in the slightest
+startup = Startup()
+
+
+pp = None
+pyparsing_status = None             # None until pyparsing is first needed, then "ready" or "failed"
+pyparsing_lock = threading.Lock()
+
+
+def load_pyparsing():
+    """ Imports pyparsing, attempting a pip install if it is missing or outdated
+    """
+    global pp, pyparsing_status
+    start = time.perf_counter()
 
     try:
-        if platform.system() == "Linux" and platform.freedesktop_os_release()["ID"] in ("org.kde.Platform", "org.freedesktop.platform"):
-            subprocess.check_call([*py_executable, '-m', 'ensurepip'])          # Flatpak is weirdge
+        pyp_version = meta.version("pyparsing")
+        if int(pyp_version[0]) >= 3:
+            import pyparsing as pp
+            print(f"Found pyparsing {pyp_version}")
+            pyp_satisfied = True
+        else:
+            print(f"Pyparsing outdated : found {pyp_version}, requires 3.0")
+            pyp_satisfied = False
+    except (meta.PackageNotFoundError, ModuleNotFoundError):
+        print("Pyparsing not found")
+        pyp_satisfied = False
+
+
+    if not pyp_satisfied:
+        print("Pyparsing requirements not satisfied, attempting pip install")
+        options = ['--target', sys.path[-1]]
+
+        if platform.system() == "Windows":
+            py_executable = [os.path.join(sys.exec_prefix, "python")]
+        elif platform.system() == "Darwin":
+            py_executable = [os.path.join(sys.exec_prefix, f"bin/python{sys.version_info[0]}.{sys.version_info[1]}")]
+        else:
+            py_executable = [f"python{sys.version_info[0]}.{sys.version_info[1]}"]    # No, sys.executable is not trustworthy in the slightest
+
+        try:
+            if platform.system() == "Linux" and platform.freedesktop_os_release()["ID"] in ("org.kde.Platform", "org.freedesktop.platform"):
+                subprocess.check_call([*py_executable, '-m', 'ensurepip'])          # Flatpak is weirdge
+
+            subprocess.check_call([*py_executable, '-m', 'pip', 'install',  *options, '--upgrade', 'pyparsing'])
+            import pyparsing as pp
+            print("Pyparsing successfully imported")
+
+        except Exception as exc:
+            print("pyparsing import failed :")
+            logging.exception(exc)
+            pp = None
+
+    pyparsing_status = "ready" if pp else "failed"
+    print(f"Pyparsing {pyparsing_status} in {(time.perf_counter() - start) * 1000:.1f}ms")
 
-        subprocess.check_call([*py_executable, '-m', 'pip', 'install',  *options, '--upgrade', 'pyparsing'])
-        import pyparsing as pp
-        print("Pyparsing successfully imported")
 
-    except Exception as exc:
-        print("pyparsing import failed :")
-        logging.exception(exc)
-        pp = None
+def pyparsing_available():
+    """ Loads pyparsing on its first use, returns whether it can be used
+    """
+    with pyparsing_lock:
+        if pyparsing_status is None:
+            load_pyparsing()
+    return pp is not None
 
 
 
@@ -103,6 +150,8 @@ minimum_required = ((obs_required_version['major']<<24) |
                     (obs_required_version['patch']<<0))
 obs_version_check = obs_version >= minimum_required
 
+startup.mark("version check")
+
 ###################################################################################################
 ###### Script customisation #######################################################################
 ###################################################################################################
@@ -113,6 +162,13 @@ remove_zws = True
 token_delimiter = "$"
 
 
+parser_engine = "native"            # "native" or "pyparsing"
+
+render_deadline = 2.0               # Seconds the exec and if tokens of a filename may take before OBS's formatting is used instead (0 to disable)
+
+formatter_profiles = {}             # Additional outputs named by the script, e.g. Source Record's, see the documentation
+
+
 source_fetch_proc = {"game_capture" :                 {"get_hooked":[("string",   "title"),
                                                                      ("string",   "class"),
                                                                      ("string",   "executable"),
@@ -192,6 +248,12 @@ ex_whitelist    = (ast.Constant, ast.JoinedStr, ast.FormattedValue,
                    ast.ListComp, ast.SetComp, ast.GeneratorExp, ast.DictComp, ast.comprehension
                    )
 
+text_file_tail_lines = 0            # If above 0, only the last lines of the text files are read
+
+timings_enabled = False             # If true, times each stage of the filename generation, see the "Dump timings" button
+snapshot_capture_file = ""          # If set, the data of every render is appended to this file, in the script's config folder, for benchmarks/render.py
+
+
 def source_post_process(source, settings):
     """ Called on every source, allows to add to or modify its tokens (the "settings" dict).
     """
@@ -201,8 +263,7 @@ def source_post_process(source, settings):
         try:
             if settings["from_file"]:
                 try:
-                    with open(settings["text_file"], 'rt', encoding="utf8") as file:
-                        settings["file_text"] = " ".join([line.strip() for line in file.readlines()])
+                    settings["file_text"] = read_text_file(settings["text_file"])
 
                 except FileNotFoundError:
                     print(f"Source \"{obs.obs_source_get_name(source)}\": File {settings['text_file']} not found.")
@@ -223,8 +284,7 @@ def source_post_process(source, settings):
         try:
             if settings["read_from_file"]:
                 try:
-                    with open(settings["file"], 'rt', encoding="utf8") as file:
-                        settings["file_text"] = " ".join([line.strip() for line in file.readlines()])
+                    settings["file_text"] = read_text_file(settings["file"])
 
                 except FileNotFoundError:
                     print(f"Source \"{obs.obs_source_get_name(source)}\": File {settings['file']} not found.")
@@ -241,6 +301,121 @@ def source_post_process(source, settings):
 
 
 
+###################################################################################################
+###### Timings ####################################################################################
+###################################################################################################
+
+# Only active with timings_enabled, which is read when the functions get defined or compiled,
+# so that disabled timings cost nothing on the filename generation.
+
+class Histogram():
+    """ Durations of one stage, counted in power of two buckets from 1µs to ~1s, plus one overflow bucket
+    """
+    bounds = tuple(2 ** n for n in range(21))
+
+    def __init__(self):
+        self.buckets    = [0] * (len(self.bounds) + 1)
+        self.count      = 0
+        self.total      = 0.0
+        self.min        = float("inf")
+        self.max        = 0.0
+
+    def add(self, duration):
+        self.buckets[bisect.bisect_left(self.bounds, duration * 1e6)] += 1
+        self.count += 1
+        self.total += duration
+        self.min = min(self.min, duration)
+        self.max = max(self.max, duration)
+
+    def percentile(self, fraction):
+        """ Upper bound in seconds of the bucket holding the given fraction of the durations
+        """
+        rank = fraction * self.count
+        seen = 0
+        for ind, count in enumerate(self.buckets):
+            seen += count
+            if seen >= rank and count:
+                return min(self.bounds[ind] / 1e6, self.max) if ind < len(self.bounds) else self.max
+        return self.max
+
+    def as_dict(self):
+        return {"count":    self.count,
+                "total":    self.total,
+                "mean":     self.total / self.count if self.count else 0.0,
+                "min":      self.min if self.count else 0.0,
+                "max":      self.max,
+                "p50":      self.percentile(0.5),
+                "p99":      self.percentile(0.99),
+                "buckets":  dict(zip([f"<={bound}us" for bound in self.bounds] + ["overflow"], self.buckets)),
+                }
+
+
+class Timings():
+    """ Histograms by stage name
+    """
+    histograms = {}
+
+timings = Timings()
+
+
+def record_timing(stage, start):
+    """ Adds the time elapsed since start (a time.perf_counter() value) to the histogram of stage
+    """
+    duration = time.perf_counter() - start
+    try:
+        timings.histograms[stage].add(duration)
+    except KeyError:
+        timings.histograms[stage] = Histogram()
+        timings.histograms[stage].add(duration)
+
+
+def timed(stage):
+    """ Decorator recording the duration of each call under stage
+        Leaves the function untouched if timings are disabled
+    """
+    def decorator(func):
+        if not timings_enabled:
+            return func
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                record_timing(stage, start)
+        return wrapper
+    return decorator
+
+
+timings_file = "adv-ff_timings.json"
+
+
+def dump_timings(props=None, prop=None):
+    """ Prints the timings summary to the script log and exports the full histograms as json
+    """
+    if not timings_enabled:
+        print("Timings are disabled, set timings_enabled to True at the start of the script to enable them")
+        return False
+
+    print(f"{'Stage':<28}{'count':>8}{'mean':>12}{'p50':>12}{'p99':>12}{'max':>12}")
+    for stage, histogram in sorted(timings.histograms.items()):
+        summary = histogram.as_dict()
+        print(f"{stage:<28}{summary['count']:>8}"
+              + "".join(f"{summary[key] * 1e6:>10.1f}µs" for key in ("mean", "p50", "p99", "max")))
+
+    try:
+        path = config_file_path(timings_file)
+        with open(path, 'w', encoding="utf8") as file:
+            json.dump({stage: histogram.as_dict() for stage, histogram in timings.histograms.items()}, file, indent=4)
+        print(f"Timings exported to {path}")
+    except OSError as exc:
+        print(f"Timings export failed : {exc}")
+    return False
+
+
+
+
 ###################################################################################################
 ###### Function wrapping ##########################################################################
 ###################################################################################################
@@ -332,6 +507,11 @@ _obs_frontend_get_last_recording = wrap(libfe,
                                        restype=ct.c_void_p,
                                        argtypes=[])
 
+_os_get_config_path_ptr         = wrap(libobs,
+                                       "os_get_config_path_ptr",
+                                       restype=ct.c_void_p,
+                                       argtypes=[ct.c_char_p])
+
 _bfree                          = wrap(libobs,
                                        "bfree",
                                        restype=None,
@@ -356,19 +536,123 @@ def obs_frontend_get_last_recording():
         return value.decode("utf-8")
     return ""
 
-def valid_formatted_length(file_format):    # This is an abomination I really hope the filename formatting crop will be fixed soonish -  Lol. Lmfao even. (Dec 2025)
-    available_length = 255 - 10             # We assume no extension will ever be more than 10 bytes, if there exists one that does, fuck that noise
 
+def os_get_config_path(name):
+    path_p = _os_get_config_path_ptr(name.encode("utf-8"))
+    value  = ct.c_char_p(path_p).value
+    _bfree(path_p)
+    if value:
+        return value.decode("utf-8")
+    return ""
+
+
+# The script's folder of the OBS config, next to the plugins' ones
+config_folder = "obs-studio/plugin_config/adv-ff"
+
+
+def config_file_path(filename):
+    """ Path of a file of the script, relative ones being in the script's folder of the OBS config
+        Raises OSError if that folder can't be created
+    """
+    if os.path.isabs(filename):
+        return filename
+    folder = os_get_config_path(config_folder)
+    os.makedirs(folder, exist_ok=True)
+    return os.path.join(folder, filename)
+
+
+# OBS filename formatting specifiers, which must never be cut in the middle
+formatting_specifiers = ("%CCYY", "%CRES", "%ORES", "%FPS", "%YY", "%MM", "%DD", "%hh", "%mm", "%ss", "%VF", "%%",
+                         "%a", "%A", "%b", "%B", "%d", "%H", "%I", "%m", "%M", "%p", "%s", "%S", "%y", "%Y", "%z", "%Z")
+formatting_units_pattern = re.compile("|".join(re.escape(spec) for spec in formatting_specifiers) + r"|[\s\S]")
+
+
+class FormattedLengthCache():
+    """ Results of valid_formatted_length, only valid within the same second since they depend on the date
+    """
+    second  = None
+    lengths = {}
+
+formatted_length_cache = FormattedLengthCache()
+
+
+def formatted_byte_length(file_format):
+    """ Length in bytes of the filename OBS generates from file_format, without extension
+    """
     formatted_p = _os_generate_formatted_filename("".encode("utf-8"), False, file_format.encode("utf-8"))
     value       = ct.c_char_p(formatted_p).value
     _bfree(formatted_p)
+    return len(value or b"")
+
+
+@timed("truncate")
+def valid_formatted_length(file_format):    # This is an abomination I really hope the filename formatting crop will be fixed soonish -  Lol. Lmfao even. (Dec 2025)
+    """ Returns the length of the longest prefix of file_format whose generated filename fits in the allowed length
+        Binary searches the cut point over whole characters and formatting specifiers
+    """
+    available_length = 255 - 10             # We assume no extension will ever be more than 10 bytes, if there exists one that does, fuck that noise
+
+    second = int(time.time())
+    if formatted_length_cache.second != second:
+        formatted_length_cache.second = second
+        formatted_length_cache.lengths = {}
+    try:
+        return formatted_length_cache.lengths[file_format]
+    except KeyError:
+        pass
+
+    if formatted_byte_length(file_format) <= available_length:
+        length = len(file_format)
+
+    else:
+        ends = [match.end() for match in formatting_units_pattern.finditer(file_format)]
+        low, high = 0, len(ends)            # Number of units known to fit, and known not to
+        while high - low > 1:
+            mid = (low + high) // 2
+            if formatted_byte_length(file_format[:ends[mid - 1]]) <= available_length:
+                low = mid
+            else:
+                high = mid
+        length = ends[low - 1] if low else 0
+
+    formatted_length_cache.lengths[file_format] = length
+    return length
+
+
+#### Typed obs_data access, used by the lazy source settings
+###################################################################################################
 
-    while len(value) > available_length:
-        file_format = file_format[:-1]
-        formatted_p = _os_generate_formatted_filename("".encode("utf-8"), False, file_format.encode("utf-8"))
-        value       = ct.c_char_p(formatted_p).value
-        _bfree(formatted_p)
-    return len(file_format)
+_obs_data_item_byname           = wrap(libobs, "obs_data_item_byname",          restype=ct.c_void_p,    argtypes=[ct.c_void_p, ct.c_char_p])
+_obs_data_first                 = wrap(libobs, "obs_data_first",                restype=ct.c_void_p,    argtypes=[ct.c_void_p])
+_obs_data_item_next             = wrap(libobs, "obs_data_item_next",            restype=ct.c_bool,      argtypes=[ct.POINTER(ct.c_void_p)])
+_obs_data_item_release          = wrap(libobs, "obs_data_item_release",         restype=None,           argtypes=[ct.POINTER(ct.c_void_p)])
+_obs_data_item_get_name         = wrap(libobs, "obs_data_item_get_name",        restype=ct.c_char_p,    argtypes=[ct.c_void_p])
+_obs_data_item_gettype          = wrap(libobs, "obs_data_item_gettype",         restype=ct.c_int,       argtypes=[ct.c_void_p])
+_obs_data_item_numtype          = wrap(libobs, "obs_data_item_numtype",         restype=ct.c_int,       argtypes=[ct.c_void_p])
+_obs_data_item_has_user_value   = wrap(libobs, "obs_data_item_has_user_value",  restype=ct.c_bool,      argtypes=[ct.c_void_p])
+_obs_data_addref                = wrap(libobs, "obs_data_addref",               restype=None,           argtypes=[ct.c_void_p])
+_obs_data_release               = wrap(libobs, "obs_data_release",              restype=None,           argtypes=[ct.c_void_p])
+_obs_data_array_count           = wrap(libobs, "obs_data_array_count",          restype=ct.c_size_t,    argtypes=[ct.c_void_p])
+_obs_data_array_item            = wrap(libobs, "obs_data_array_item",           restype=ct.c_void_p,    argtypes=[ct.c_void_p, ct.c_size_t])
+_obs_data_array_release         = wrap(libobs, "obs_data_array_release",        restype=None,           argtypes=[ct.c_void_p])
+
+# (user value getter, default value getter) for each item type
+_obs_data_item_getters = {
+    "string":   (wrap(libobs, "obs_data_item_get_string",           restype=ct.c_char_p,    argtypes=[ct.c_void_p]),
+                 wrap(libobs, "obs_data_item_get_default_string",   restype=ct.c_char_p,    argtypes=[ct.c_void_p])),
+    "int":      (wrap(libobs, "obs_data_item_get_int",              restype=ct.c_longlong,  argtypes=[ct.c_void_p]),
+                 wrap(libobs, "obs_data_item_get_default_int",      restype=ct.c_longlong,  argtypes=[ct.c_void_p])),
+    "double":   (wrap(libobs, "obs_data_item_get_double",           restype=ct.c_double,    argtypes=[ct.c_void_p]),
+                 wrap(libobs, "obs_data_item_get_default_double",   restype=ct.c_double,    argtypes=[ct.c_void_p])),
+    "bool":     (wrap(libobs, "obs_data_item_get_bool",             restype=ct.c_bool,      argtypes=[ct.c_void_p]),
+                 wrap(libobs, "obs_data_item_get_default_bool",     restype=ct.c_bool,      argtypes=[ct.c_void_p])),
+    "obj":      (wrap(libobs, "obs_data_item_get_obj",              restype=ct.c_void_p,    argtypes=[ct.c_void_p]),
+                 wrap(libobs, "obs_data_item_get_default_obj",      restype=ct.c_void_p,    argtypes=[ct.c_void_p])),
+    "array":    (wrap(libobs, "obs_data_item_get_array",            restype=ct.c_void_p,    argtypes=[ct.c_void_p]),
+                 wrap(libobs, "obs_data_item_get_default_array",    restype=ct.c_void_p,    argtypes=[ct.c_void_p])),
+    }
+
+startup.mark("libraries")
 
 
 
@@ -381,7 +665,12 @@ def valid_formatted_length(file_format):    # This is an abomination I really ho
 ###### Parser Grammar #############################################################################
 ###################################################################################################
 
-if pp:
+@functools.cache
+def pyparsing_grammar():
+    """ Builds the pyparsing grammar, on its first use
+    """
+    start = time.perf_counter()
+
     def if_action(tokens):
         return(("if", *tokens.as_list()))
 
@@ -461,282 +750,2268 @@ if pp:
                              | str_block
                              )
 
+    print(f"Pyparsing grammar built in {(time.perf_counter() - start) * 1000:.1f}ms")
+    return grammar
+
+
+
+###################################################################################################
+###### Native parser ##############################################################################
+###################################################################################################
+
+# Hand-written equivalent of the pyparsing grammar above, producing the same trees.
+# The string is scanned once for delimiter positions, and string blocks are then consumed up to
+# the next position where a token could start instead of one character at a time.
+# Token attempts and nested blocks are memoized by position, which keeps parsing linear.
+
+class ParseError(Exception):
+    """ Raised when a formatting string is malformed
+    """
+
+
+class NativeParser():
+    """ Recursive descent parser for the formatting language
+    """
+    def __init__(self, string, delimiter):
+        self.string = string.expandtabs()     # Mirrors pyparsing's default behaviour
+        self.delim = delimiter
+        self.kw = {name: f"{delimiter}{name}{delimiter}" for name in ("exec", "if", "then", "else", "end")}
+        self.token_memo = {}
+        self.grammar_memo = {}
+
+        self.delims = []
+        pos = self.string.find(delimiter)
+        while pos != -1:
+            self.delims.append(pos)
+            pos = self.string.find(delimiter, pos + 1)
+
+    def parse(self):
+        """ Parses the whole string, raises ParseError if some of it can't be consumed
+        """
+        nodes, end = self.grammar(0)
+        if end != len(self.string):
+            raise ParseError(f"Unexpected {self.string[end:end+10]!r} at char {end}")
+        return nodes
+
+    def is_keyword(self, pos):
+        return any(self.string.startswith(kw, pos) for kw in self.kw.values())
+
+    def next_stop(self, pos):
+        """ Returns the end of the string block starting at pos
+        """
+        ind = bisect.bisect_left(self.delims, pos)
+        if ind == len(self.delims):
+            return len(self.string)
+
+        delim_pos = self.delims[ind]
+        if (delim_pos > pos
+            and self.string[delim_pos - 1] in "vca"
+            and self.token(delim_pos - 1)):
+            return delim_pos - 1
+        return delim_pos
+
+    def token(self, pos):
+        """ Attempts to parse a value, counter or advss token at pos
+            Returns (node, end) or None
+        """
+        try:
+            return self.token_memo[pos]
+        except KeyError:
+            pass
+
+        result = None
+        start = pos + 1
+        if (self.string[pos:start] in ("v", "c", "a")
+            and self.string.startswith(self.delim, start)
+            and not self.is_keyword(start)):
+
+            nodes, end = self.grammar(start + len(self.delim))
+            if self.string.startswith(self.delim, end):
+                tag = {"v": "value", "c": "counter", "a": "advss"}[self.string[pos]]
+                result = ((tag, nodes), end + len(self.delim))
+
+        self.token_memo[pos] = result
+        return result
+
+    def block(self, pos):
+        """ Attempts to parse an exec or if block at pos
+            Returns (node, end) or None
+        """
+        if self.string.startswith(self.kw["exec"], pos):
+            expr, end = self.grammar(pos + len(self.kw["exec"]))
+            if self.string.startswith(self.kw["end"], end):
+                return ("exec", expr), end + len(self.kw["end"])
+            return None
+
+        if self.string.startswith(self.kw["if"], pos):
+            cond, end = self.grammar(pos + len(self.kw["if"]))
+            if not self.string.startswith(self.kw["then"], end):
+                return None
+            then_block, end = self.grammar(end + len(self.kw["then"]))
+            blocks = [cond, then_block]
+            if self.string.startswith(self.kw["else"], end):
+                else_block, end = self.grammar(end + len(self.kw["else"]))
+                blocks.append(else_block)
+            if self.string.startswith(self.kw["end"], end):
+                return ("if", *blocks), end + len(self.kw["end"])
+        return None
+
+    def grammar(self, pos):
+        """ Parses as many nodes as possible starting at pos
+            Returns (nodes, end)
+        """
+        try:
+            return self.grammar_memo[pos]
+        except KeyError:
+            start = pos
+
+        nodes = []
+        while pos < len(self.string):
+            result = self.block(pos) or self.token(pos)
+            if result:
+                nodes.append(result[0])
+                pos = result[1]
+                continue
+
+            end = self.next_stop(pos)
+            if end == pos:
+                break
+            nodes.append(("string", self.string[pos:end]))
+            pos = end
+
+        self.grammar_memo[start] = (nodes, pos)
+        return nodes, pos
+
+
+def parse_format(string, engine=None):
+    """ Parses a formatting string into a tree, with the selected parser engine
+        Raises ParseError if the string is malformed
+    """
+    engine = engine or parser_engine
+
+    if engine == "native":
+        try:
+            tree = NativeParser(string, token_delimiter).parse()
+        except ParseError:
+            raise
+        except Exception as exc:                      # Most likely RecursionError on absurd nesting, which pyparsing can't read either
+            raise ParseError(repr(exc)) from exc
+        return tree
+
+    if not pyparsing_available():
+        print("Pyparsing is not available, using the native parser")
+        return parse_format(string, "native")
+
+    try:
+        return pyparsing_grammar().parse_string(string, True).as_list()
+    except pp.exceptions.ParseException as exc:
+        raise ParseError(str(exc)) from exc
+
+
+
+###################################################################################################
+###### Interpreter ################################################################################
+###################################################################################################
+
+class Counters():
+    """Holds the values of the counters, the currently selected one and the value shown for it in the UI
+        Renders run on the UI, hotkey and output threads, so the values are only changed under the lock
+    """
+    data        = {}
+    selected    = None
+    shown       = None
+    lock        = threading.RLock()
+    skipped     = 0
+
+counters = Counters()
+
+expression_cache_size = 256
+
+class ExpressionCache():
+    """ LRU cache of the validated and compiled exec/if expressions, keyed on (mode, expression)
+        Cleared whenever the whitelists or locals get modified
+    """
+    entries = collections.OrderedDict()
+    context = None
+    hits    = 0
+    misses  = 0
+
+    def stats(self):
+        total = self.hits + self.misses
+        return (f"{self.hits} hits, {self.misses} misses ({100 * self.hits / total if total else 0:.1f}% hit rate), "
+                f"{len(self.entries)}/{expression_cache_size} entries")
+
+expression_cache = ExpressionCache()
+
+
+class WhitelistVisitor(ast.NodeVisitor):
+    """ Raises ValueError on any node absent from the whitelist
+    """
+    def __init__(self, whitelist):
+        self.whitelist = whitelist
+
+    def visit(self, node):
+        if not isinstance(node, self.whitelist):
+            raise ValueError(type(node))
+        return super().visit(node)
+
+
+def compile_expression(expr, mode):
+    """ Parses, checks against the whitelist of the mode ("exec" or "if") and compiles an expression
+        Returns (code, 200) or (exception, error code), cached across calls
+    """
+    context = (ex_whitelist, if_whitelist, ex_locals, if_locals)
+    if (expression_cache.context is None
+        or any(new is not old and new != old for new, old in zip(context, expression_cache.context))):
+        expression_cache.entries.clear()
+        expression_cache.context = (ex_whitelist, if_whitelist, dict(ex_locals), dict(if_locals))
+
+    key = (mode, expr)
+    try:
+        result = expression_cache.entries[key]
+        expression_cache.entries.move_to_end(key)
+        expression_cache.hits += 1
+        return result
+    except KeyError:
+        expression_cache.misses += 1
+
+    try:
+        node = ast.parse(expr.strip(), mode='eval')
+        try:
+            WhitelistVisitor(ex_whitelist if mode == "exec" else if_whitelist).visit(node)
+            result = compile(node, "<string>", "eval"), 200
+        except ValueError as ex:
+            result = ex, 405
+    except (SyntaxError, ValueError) as ex:
+        result = ex, 400
+
+    expression_cache.entries[key] = result
+    while len(expression_cache.entries) > expression_cache_size:
+        expression_cache.entries.popitem(last=False)
+    return result
+
+
+class RenderTimeout(Exception):
+    """ Raised by an evaluation once the render it belongs to is past its budget
+    """
+
+
+class RenderBudget():
+    """ Time budget of the render running on this thread, checked by the exec and if evaluations
+        Used as a context manager around the render, no budget given meaning none enforced
+    """
+    current = threading.local()
+
+    def __init__(self, seconds):
+        self.end = time.perf_counter() + seconds if seconds else None
+        self.outer = None
+
+    def __enter__(self):
+        self.outer = getattr(self.current, "budget", None)
+        self.current.budget = self
+        return self
+
+    def __exit__(self, *args):
+        self.current.budget = self.outer
+
+
+def budget_tracer(frame, event, arg):
+    """ Trace function checking the budget on every call and line run by an evaluation
+    """
+    if time.perf_counter() > RenderBudget.current.budget.end:
+        raise RenderTimeout
+    return budget_tracer
+
+
+def budgeted_eval(code, local_vars):
+    """ Evaluates compiled code, stopping at the next python call or line past the render's budget
+        A single builtin call, e.g. sum(range(10**9)), can't be stopped midway
+    """
+    budget = getattr(RenderBudget.current, "budget", None)
+    if budget is None or budget.end is None:
+        return eval(code, {'__builtins__': None}, local_vars)
+    if time.perf_counter() > budget.end:
+        raise RenderTimeout
+    previous = sys.gettrace()
+    sys.settrace(budget_tracer)
+    try:
+        return eval(code, {'__builtins__': None}, local_vars)
+    finally:
+        sys.settrace(previous)
+
+
+def exec_eval(expr):
+    """ Checks for validity and legality of exec token statement then evaluates it
+    """
+    code, status = compile_expression(expr, "exec")
+    if status != 200:
+        return code, status
+
+    try:
+        return budgeted_eval(code, ex_locals), 200
+    except RenderTimeout:
+        raise RenderTimeout(expr.strip()) from None
+    except Exception as ex:
+        return ex, 422
+
+
+def if_eval(expr):
+    """ Checks for validity and legality of if token condition then evaluates it
+    """
+    code, status = compile_expression(expr, "if")
+    if status != 200:
+        return code, status
+
+    try:
+        return budgeted_eval(code, if_locals), 200
+    except RenderTimeout:
+        raise RenderTimeout(expr.strip()) from None
+    except Exception as ex:
+        return ex, 422
+
+
+def counter_eval(counter_id, increase=True):
+    """ Returns the current value of the specified counter, incrementing it if needed
+        The value taken is recorded in the reservation of the render running on this thread
+    """
+    with counters.lock:
+        value = counters.data.get(counter_id)
+        if value is None:
+            value = 0
+            set_counter(counter_id, int(increase))
+        elif increase:
+            set_counter(counter_id, value + 1)
+
+    if increase:
+        reservation = getattr(CounterReservation.current, "reservation", None)
+        if reservation is not None:
+            reservation.taken.setdefault(counter_id, []).append(value)
+
+    return str(value)
+
+
+def set_counter(name, value):
+    """ Sets the value of a counter, None removing it, and records the change in the journal
+    """
+    with counters.lock:
+        if value is None:
+            counters.data.pop(name, None)
+        else:
+            counters.data[name] = value
+        journal_counter(name, value)
+
+
+class CounterReservation():
+    """ Counter values taken during a render, so that they can be given back if its filename isn't used
+        Used as a context manager around the render, rolled back if it raises
+    """
+    current = threading.local()
+
+    def __init__(self):
+        self.taken = {}
+        self.outer = None
+
+    def __enter__(self):
+        self.outer = getattr(self.current, "reservation", None)
+        self.current.reservation = self
+        return self
+
+    def __exit__(self, exc_type, *args):
+        self.current.reservation = self.outer
+        if exc_type is not None:
+            self.rollback()
+        elif self.outer is not None:
+            self.outer.merge(self)
+
+    def merge(self, other):
+        """ Takes over the values of another reservation
+        """
+        for name, values in other.taken.items():
+            self.taken.setdefault(name, []).extend(values)
+
+    def rollback(self):
+        """ Gives the values back, unless a later value of the same counter was taken since,
+            in which case they are skipped rather than risk handing out the same value twice
+        """
+        with counters.lock:
+            for name, values in self.taken.items():
+                for value in sorted(values, reverse=True):
+                    if counters.data.get(name) == value + 1:
+                        set_counter(name, value)
+                    else:
+                        counters.skipped += 1
+                        print(f"Counter {name} : value {value} skipped, a later one was already taken")
+            self.taken = {}
+
+
+#### Counter journal
+###################################################################################################
+
+# Every counter change is appended to the journal as a json line, and the journal is synced to disk
+# once per generated filename rather than once per change. On load, it is replayed over the counters
+# saved in the script's settings, which OBS only writes on a clean save.
+
+counter_journal_file = "adv-ff_counters.journal"
+counter_journal_compact = 1000      # Entries after which the journal is rewritten as just the current counters
+
+class CounterJournal():
+    """ Open journal file, number of entries written to it since it was last compacted,
+        and why it was last closed on an error, shown in the script's description
+    """
+    file    = None
+    entries = 0
+    pending = False
+    failure = None
+
+counter_journal = CounterJournal()
+
+
+def counter_journal_failed(exc):
+    """ Stops journaling until the journal is next compacted, renders go on without it
+    """
+    if counter_journal.failure is None:
+        print(f"Counter journal unavailable, counters are only saved with the script's settings : {exc}")
+    counter_journal.failure = str(exc)
+    if counter_journal.file is not None:
+        try:
+            counter_journal.file.close()
+        except OSError:
+            pass
+        counter_journal.file = None
+    counter_journal.pending = False
+
+
+def journal_counter(name, value):
+    """ Appends a counter change to the journal, only written to disk by sync_counter_journal
+    """
+    if counter_journal.file is None:
+        return
+    try:
+        counter_journal.file.write(json.dumps(["set", name, value] if value is not None else ["del", name]) + "\n")
+    except OSError as exc:
+        counter_journal_failed(exc)
+        return
+    counter_journal.entries += 1
+    counter_journal.pending = True
+
+
+def sync_counter_journal():
+    """ Writes the pending changes to disk, compacting the journal if it grew too long
+    """
+    with counters.lock:
+        if not counter_journal.pending:
+            return
+        try:
+            counter_journal.file.flush()
+            os.fsync(counter_journal.file.fileno())
+        except OSError as exc:
+            counter_journal_failed(exc)
+            return
+        counter_journal.pending = False
+
+        if counter_journal.entries > counter_journal_compact:
+            compact_counter_journal()
+
+
+def compact_counter_journal():
+    """ Rewrites the journal as the current value of each counter, and opens it for appending
+    """
+    if not counter_journal_file:
+        return
+    with counters.lock:
+        try:
+            if counter_journal.file is not None:
+                counter_journal.file.close()
+                counter_journal.file = None
+            path = config_file_path(counter_journal_file)
+            with open(f"{path}.tmp", 'w', encoding="utf8") as file:
+                file.write(json.dumps(["collection", obs.obs_frontend_get_current_scene_collection()]) + "\n")
+                for name, value in counters.data.items():
+                    file.write(json.dumps(["set", name, value]) + "\n")
+                file.flush()
+                os.fsync(file.fileno())
+            os.replace(f"{path}.tmp", path)
+            counter_journal.file = open(path, 'a', encoding="utf8")
+        except OSError as exc:
+            counter_journal.file = None
+            counter_journal_failed(exc)
+            return
+        counter_journal.entries = len(counters.data)
+        counter_journal.pending = False
+        counter_journal.failure = None
+
+
+def replay_counter_journal():
+    """ Applies the journal over the counters loaded from the settings
+        Ignored if it was written for another scene collection, stops at the first damaged entry
+    """
+    if not counter_journal_file:
+        return
+    try:
+        with open(config_file_path(counter_journal_file), 'rt', encoding="utf8") as file:
+            lines = file.read().splitlines()
+    except FileNotFoundError:
+        return
+    except (OSError, ValueError) as exc:
+        print(f"Counter journal unreadable, ignoring it : {exc}")
+        return
+
+    try:
+        if json.loads(lines[0]) != ["collection", obs.obs_frontend_get_current_scene_collection()]:
+            return
+    except (IndexError, ValueError):
+        print("Counter journal has no valid header, ignoring it")
+        return
+
+    changes = {}
+    for line in lines[1:]:
+        try:
+            entry = json.loads(line)
+            match entry:
+                case ["set", str(name), int(value)]:
+                    changes[name] = value
+                case ["del", str(name)]:
+                    changes[name] = None
+                case _:
+                    raise ValueError(entry)
+        except ValueError:
+            print(f"Counter journal damaged, ignoring it from : {line!r}")
+            break
+
+    with counters.lock:
+        for name, value in changes.items():
+            if value is None:
+                counters.data.pop(name, None)
+            elif counters.data.get(name) != value:
+                print(f"Counter {name} restored from the journal : {counters.data.get(name)} -> {value}")
+                counters.data[name] = value
+
+
+@timed("advss")
+def advss_fetch(name, calldata=None):
+    """ Fetches and returns the value of the adv-ss variable with name `name`
+        Uses the given calldata if any, instead of creating one
+    """
+    if AdvssResolver.unavailable:
+        return "", 501
+
+    data = calldata or obs.calldata_create()
+    obs.calldata_set_string(data, "name", str(name))    # As far as I can see there is no python object that fails to convert to str so no need to guard this
+    obs.calldata_set_bool(data, "success", False)
+    found = obs.proc_handler_call(obs.obs_get_proc_handler(), "advss_get_variable_value", data)
+
+    if not found:                                       # Adv-ss plugin not loaded, no need to ask again until it might be
+        value, code = "", 501
+        AdvssResolver.unavailable = True
+    elif obs.calldata_bool(data, "success"):
+        value, code = obs.calldata_string(data, "value"), 200
+    else:
+        value, code = "", 404
+
+    if not calldata:
+        obs.calldata_destroy(data)
+    return value, code
+
+
+class AdvssResolver():
+    """ Fetches the adv-ss variables of one render, each at most once and through a single calldata
+        `unavailable` is shared by all renders, and set when the adv-ss plugin isn't loaded
+    """
+    unavailable = False
+
+    def __init__(self):
+        self.values = {}
+        self.calldata = None
+
+    def fetch(self, name):
+        """ Returns (value, code) as advss_fetch does
+        """
+        try:
+            return self.values[name]
+        except KeyError:
+            pass
+        if self.calldata is None and not self.unavailable:
+            self.calldata = obs.calldata_create()
+        self.values[name] = advss_fetch(name, self.calldata)
+        return self.values[name]
+
+    def prefetch(self, names):
+        for name in names:
+            self.fetch(name)
+        self.release()
+
+    def release(self):
+        """ Destroys the calldata, a new one is created if some variable still needs to be fetched
+        """
+        if self.calldata is not None:
+            obs.calldata_destroy(self.calldata)
+            self.calldata = None
+
+
+class RenderData(dict):
+    """ Data object of a render, holding the render's adv-ss resolver along the tokens
+    """
+    def __init__(self):
+        super().__init__()
+        self.advss = AdvssResolver()
+
+
+source_getters = {"width":    obs.obs_source_get_width,
+                  "height":   obs.obs_source_get_height,
+                  "muted":    obs.obs_source_muted,
+                  "active":   obs.obs_source_active,
+                  "showing":  obs.obs_source_showing,
+                  }
+
+global_tokens = ("user", "username", "scene", "program", "preview", "day", "Day", "month", "Month", "executable", "title")
+
+
+class Dependencies():
+    """ Data that can be reached by a parsed tree, as found by tree_dependencies
+        full    : some key is only known at render time, everything has to be fetched
+        sources : source reference (index or name) -> set of keys, or None for the whole source
+        tokens  : referenced global tokens
+        advss   : adv-ss variables whose name is known statically
+    """
+    def __init__(self):
+        self.full = False
+        self.sources = {}
+        self.tokens = set()
+        self.advss = set()
+
+    def add_source(self, ref, key):
+        if key is None or self.sources.get(ref, set()) is None:
+            self.sources[ref] = None
+        else:
+            self.sources.setdefault(ref, set()).add(key)
+
+    def source_keys(self, sources):
+        """ Maps the indices of the given source list to the keys needed from them
+        """
+        wanted = {}
+        for ref, keys in self.sources.items():
+            for ind, source_name in enumerate(sources):
+                if ref == ind or ref == source_name:
+                    if keys is None or wanted.get(ind, set()) is None:
+                        wanted[ind] = None
+                    else:
+                        wanted[ind] = wanted.get(ind, set()) | keys
+        return wanted
+
+
+def tree_dependencies(tree, deps=None):
+    """ Statically walks a parsed tree to find the sources, keys and global tokens it can reach
+    """
+    deps = deps or Dependencies()
+    for node in tree:
+        if node[0] == "string":
+            continue
+
+        for subtree in node[1:]:
+            tree_dependencies(subtree, deps)
+
+        if node[0] == "advss":
+            if all(subnode[0] == "string" for subnode in node[1]):
+                interpreted = "".join(subnode[1] for subnode in node[1])
+                deps.advss.add(interpreted.translate(zws_table))
+            continue
+
+        if node[0] != "value":
+            continue
+        if any(subnode[0] != "string" for subnode in node[1]):
+            deps.full = True
+            continue
+
+        interpreted = "".join(subnode[1] for subnode in node[1]).translate(zws_table)
+        path = key_path(interpreted)
+
+        if path[0] in global_tokens:
+            deps.tokens.add(path[0])
+            if path[0] in ("executable", "title"):
+                deps.add_source(0, path[0])
+        else:
+            deps.add_source(path[0], path[1] if len(path) > 1 else None)
+    return deps
+
+
+class LazySettings(collections.abc.MutableMapping):
+    """ Read-only view of an obs_data object, behaving like the dict its json would give
+        Keys are only read from the obs_data when accessed, and memoized in `memo`, which can be shared
+        between several views of the same obs_data. Keys set from python (fetch procs, post-processing)
+        are layered on top, on this view only.
+        Takes ownership of the obs_data reference it's given (a raw pointer).
+    """
+    def __init__(self, data_p, memo=None):
+        self.data_p = data_p
+        self.memo = {} if memo is None else memo
+        self.overrides = {}
+        self.removed = set()
+
+    def __del__(self):
+        if self.data_p:
+            _obs_data_release(self.data_p)
+            self.data_p = None
+
+    def __getitem__(self, key):
+        try:
+            return self.overrides[key]
+        except KeyError:
+            pass
+        if key in self.removed or not isinstance(key, str):
+            raise KeyError(key)
+        try:
+            return self.memo[key]
+        except KeyError:
+            pass
+
+        item_p = _obs_data_item_byname(self.data_p, key.encode("utf-8"))
+        if not item_p:
+            raise KeyError(key)
+        value = lazy_item_value(item_p)
+        _obs_data_item_release(ct.byref(ct.c_void_p(item_p)))
+
+        self.memo[key] = value
+        return value
+
+    def __setitem__(self, key, value):
+        self.removed.discard(key)
+        self.overrides[key] = value
+
+    def __delitem__(self, key):
+        if key not in self:
+            raise KeyError(key)
+        self.overrides.pop(key, None)
+        self.removed.add(key)
+
+    def keys_from_data(self):
+        """ Names of the items present in the obs_data
+        """
+        names = []
+        item_p = ct.c_void_p(_obs_data_first(self.data_p))
+        while item_p:
+            names.append(_obs_data_item_get_name(item_p).decode("utf-8"))
+            _obs_data_item_next(ct.byref(item_p))
+        return names
+
+    def __iter__(self):
+        names = [name for name in self.keys_from_data() if name not in self.removed]
+        yield from names
+        yield from (key for key in self.overrides if key not in names)
+
+    def __len__(self):
+        return sum(1 for _ in self)
+
+    def __repr__(self):
+        return repr(dict(self.items()))
+
+
+def lazy_item_value(item_p):
+    """ Converts an obs_data item to its python value, objects and arrays being wrapped lazily
+    """
+    match _obs_data_item_gettype(item_p):
+        case obs.OBS_DATA_STRING:
+            kind = "string"
+        case obs.OBS_DATA_NUMBER:
+            kind = "int" if _obs_data_item_numtype(item_p) == obs.OBS_DATA_NUM_INT else "double"
+        case obs.OBS_DATA_BOOLEAN:
+            kind = "bool"
+        case obs.OBS_DATA_OBJECT:
+            kind = "obj"
+        case obs.OBS_DATA_ARRAY:
+            kind = "array"
+        case _:
+            return None
+
+    user_getter, default_getter = _obs_data_item_getters[kind]
+    value = (user_getter if _obs_data_item_has_user_value(item_p) else default_getter)(item_p)
+
+    match kind:
+        case "string":
+            return (value or b"").decode("utf-8")
+        case "obj":
+            return LazySettings(value) if value else {}
+        case "array":
+            if not value:
+                return []
+            items = [LazySettings(_obs_data_array_item(value, ind)) for ind in range(_obs_data_array_count(value))]
+            _obs_data_array_release(value)
+            return items
+    return value
+
+
+#### Text files
+###################################################################################################
+
+text_file_cache_size = 4000000      # Bytes
+text_file_mmap_size = 1000000       # Files of this size and over are memory-mapped rather than read
+
+class TextFileCache():
+    """ LRU cache of the text read from files, keyed on path and checked against the file's mtime and size
+        Read and filled from the output threads and the UI thread, so only accessed under the lock
+    """
+    entries = collections.OrderedDict()
+    size    = 0
+    lock    = threading.Lock()
+
+text_file_cache = TextFileCache()
+
+
+def text_file_tail(buffer, count):
+    """ Returns the position in the buffer where its last count lines start
+    """
+    end = len(buffer)
+    if buffer[end - 1:end] == b"\n":
+        end -= 1
+    for _ in range(count):
+        end = buffer.rfind(b"\n", 0, end)
+        if end == -1:
+            return 0
+    return end + 1
+
+
+def read_text_file(path):
+    """ Returns the lines of a text file stripped and joined by spaces
+        Only reads the file again if its mtime or size changed
+    """
+    stat = os.stat(path)
+    key = (stat.st_mtime_ns, stat.st_size, text_file_tail_lines)
+    with text_file_cache.lock:
+        entry = text_file_cache.entries.get(path)
+        if entry is not None and entry[0] == key:
+            text_file_cache.entries.move_to_end(path)
+            return entry[1]
+
+    with open(path, 'rb') as file:
+        if stat.st_size and stat.st_size >= text_file_mmap_size:
+            with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+                start = text_file_tail(buffer, text_file_tail_lines) if text_file_tail_lines > 0 else 0
+                raw = buffer[start:]
+        else:
+            raw = file.read()
+            if text_file_tail_lines > 0:
+                raw = raw[text_file_tail(raw, text_file_tail_lines):]
+
+    lines = raw.decode("utf8").replace("\r\n", "\n").replace("\r", "\n").split("\n")
+    if lines[-1] == "":
+        lines.pop()
+    text = " ".join([line.strip() for line in lines])
+
+    with text_file_cache.lock:
+        entry = text_file_cache.entries.pop(path, None)       # Outdated, or just read by another thread too
+        if entry is not None:
+            text_file_cache.size -= len(entry[1])
+        if len(text) <= text_file_cache_size:
+            text_file_cache.entries[path] = (key, text)
+            text_file_cache.size += len(text)
+            while text_file_cache.size > text_file_cache_size:
+                _, (_, old_text) = text_file_cache.entries.popitem(last=False)
+                text_file_cache.size -= len(old_text)
+    return text
+
+
+#### Source snapshots
+###################################################################################################
+
+# The data of the listed sources is kept between renders and updated by their signals, the settings
+# being read again on the next render after an update. Width, height and the fetch procs have no
+# signal for every change, so they are always read at render time. Sources are held through weak
+# references, the global source_create/source_remove/source_rename signals keeping them up to date.
+
+class SourceSnapshot():
+    """ Data kept between renders for a listed source
+    """
+    def __init__(self, source):
+        self.weak       = obs.obs_source_get_weak_source(source)        # Released in drop()
+        self.data_p     = int(obs.obs_source_get_settings(source))      # Live settings of the source
+        self.memo       = {}                                            # Settings values read so far
+        self.values     = {}                                            # Values of the getters kept up to date by signals
+        self.kind       = obs.obs_source_get_unversioned_id(source)
+        self.procs      = source_fetch_proc.get(self.kind, {})
+
+    @timed("fetch.source")
+    def fetch(self, keys=None):
+        """ Builds the data of the source, restricted to the given keys if specified
+            Returns None if the source doesn't exist anymore
+        """
+        source = obs.obs_weak_source_get_source(self.weak)
+        if not source:
+            return None
+        try:
+            return self.build(source, keys)
+        finally:
+            obs.obs_source_release(source)
+
+    def needs_settings(self, keys):
+        """ Whether some of the keys might come from the settings or post-processing rather than getters or procs
+        """
+        return keys is None or any(key not in source_getters
+                                   and all(key != item[1] for items in self.procs.values() for item in items)
+                                   for key in keys)
+
+    def build(self, source, keys):
+        """ Settings and post-processing are only fetched if a key might come from them
+        """
+        need_settings = self.needs_settings(keys)
+
+        if need_settings:
+            _obs_data_addref(self.data_p)
+            settings        = LazySettings(self.data_p, self.memo)
+        else:
+            settings        = {}
+
+        for key, getter in source_getters.items():
+            if keys is None or key in keys:
+                if key in snapshot_live_keys:
+                    settings[key] = getter(source)
+                elif key in self.values:
+                    settings[key] = self.values[key]
+                else:
+                    settings[key] = self.values[key] = getter(source)
+
+        for proc, items in self.procs.items():
+            if keys is None or any(key in keys for _, key in items):
+                if timings_enabled:
+                    start = time.perf_counter()
+                cd = obs.calldata_create()
+                obs.proc_handler_call(obs.obs_source_get_proc_handler(source),
+                                      proc, cd)
+                if timings_enabled:
+                    record_timing(f"proc.{proc}", start)
+                for func, key in items:
+                    settings[key] = calldata_fetchers[func](cd, key)
+                obs.calldata_destroy(cd)
+
+        if need_settings:
+            if timings_enabled:
+                start = time.perf_counter()
+            source_post_process(source, settings)
+            if timings_enabled:
+                record_timing("post_process", start)
+
+        return settings
+
+
+class SourceSnapshots():
+    """ Holds the snapshots of the listed sources by name, the listed names no source has, and the current scenes
+    """
+    entries = {}
+    missing = set()
+    scenes  = None
+
+    def get(self, name):
+        """ Returns the snapshot of the named source, creating it if needed, or None if there is no such source
+        """
+        try:
+            return self.entries[name]
+        except KeyError:
+            pass
+        if name in self.missing:
+            return None
+
+        source = obs.obs_get_source_by_name(name)
+        if not source:
+            self.missing.add(name)
+            return None
+        snapshot = SourceSnapshot(source)
+        handler = obs.obs_source_get_signal_handler(source)
+        for signal, callback in snapshot_signals.items():
+            obs.signal_handler_connect(handler, signal, callback)
+        self.entries[name] = snapshot
+        obs.obs_source_release(source)
+        return snapshot
+
+    def drop(self, name):
+        snapshot = self.entries.pop(name, None)
+        if snapshot:
+            source = obs.obs_weak_source_get_source(snapshot.weak)
+            if source:
+                handler = obs.obs_source_get_signal_handler(source)
+                for signal, callback in snapshot_signals.items():
+                    obs.signal_handler_disconnect(handler, signal, callback)
+                obs.obs_source_release(source)
+            _obs_data_release(snapshot.data_p)
+            obs.obs_weak_source_release(snapshot.weak)
+
+    def sync(self, names):
+        """ Keeps snapshots for exactly the given source names
+        """
+        for name in list(self.entries):
+            if name not in names:
+                self.drop(name)
+        self.missing &= names
+        for name in names:
+            self.get(name)
+
+    def clear(self):
+        for name in list(self.entries):
+            self.drop(name)
+        self.missing.clear()
+        self.scenes = None
+
+    def from_calldata(self, calldata):
+        """ Returns the snapshot of the source a signal was emitted for
+        """
+        return self.entries.get(obs.obs_source_get_name(obs.calldata_source(calldata, "source")))
+
+source_snapshots = SourceSnapshots()
+
+snapshot_live_keys = ("width", "height")
+
+
+def snapshot_update_cb(calldata):
+    snapshot = source_snapshots.from_calldata(calldata)
+    if snapshot:
+        snapshot.memo.clear()
+
+def snapshot_mute_cb(calldata):
+    snapshot = source_snapshots.from_calldata(calldata)
+    if snapshot:
+        snapshot.values["muted"] = obs.calldata_bool(calldata, "muted")
+
+def snapshot_state_cb(key, value):
+    def callback(calldata):
+        snapshot = source_snapshots.from_calldata(calldata)
+        if snapshot:
+            snapshot.values[key] = value
+    return callback
+
+
+snapshot_signals = {"update":       snapshot_update_cb,
+                    "mute":         snapshot_mute_cb,
+                    "activate":     snapshot_state_cb("active", True),
+                    "deactivate":   snapshot_state_cb("active", False),
+                    "show":         snapshot_state_cb("showing", True),
+                    "hide":         snapshot_state_cb("showing", False),
+                    }
+
+
+def source_create_cb(calldata):
+    source_snapshots.missing.discard(obs.obs_source_get_name(obs.calldata_source(calldata, "source")))
+
+def source_remove_cb(calldata):
+    name = obs.obs_source_get_name(obs.calldata_source(calldata, "source"))
+    if name in source_snapshots.entries:
+        source_snapshots.drop(name)
+        source_snapshots.missing.add(name)
+
+def source_rename_cb(calldata):
+    prev_name = obs.calldata_string(calldata, "prev_name")
+    new_name = obs.calldata_string(calldata, "new_name")
+    source_snapshots.missing.discard(new_name)
+    snapshot = source_snapshots.entries.pop(prev_name, None)
+    if snapshot:
+        source_snapshots.entries[new_name] = snapshot
+        queue_source_rename(prev_name, new_name)
+
+
+global_source_signals = {"source_create":    source_create_cb,
+                         "source_remove":    source_remove_cb,
+                         "source_rename":    source_rename_cb,
+                         }
+
+
+def fetch_scenes():
+    """ Returns the scene tokens
+    """
+    current_scene       = obs.obs_frontend_get_current_scene()
+    current_preview     = obs.obs_frontend_get_current_preview_scene()
+    scenes = {"scene":      obs.obs_source_get_name(current_scene),
+              "program":    obs.obs_source_get_name(current_scene) if current_preview else "",
+              "preview":    obs.obs_source_get_name(current_preview) if current_preview else "",
+              }
+    obs.obs_source_release(current_scene)
+    obs.obs_source_release(current_preview)
+    return scenes
+
+
+def snapshot_frontend_cb(event):
+    """ Keeps the scene tokens and the listed sources up to date with the frontend
+    """
+    match event:
+        case (obs.OBS_FRONTEND_EVENT_SCENE_CHANGED
+              | obs.OBS_FRONTEND_EVENT_PREVIEW_SCENE_CHANGED
+              | obs.OBS_FRONTEND_EVENT_STUDIO_MODE_ENABLED
+              | obs.OBS_FRONTEND_EVENT_STUDIO_MODE_DISABLED
+              | obs.OBS_FRONTEND_EVENT_SCENE_LIST_CHANGED):
+            source_snapshots.scenes = fetch_scenes()
+
+        case obs.OBS_FRONTEND_EVENT_FINISHED_LOADING | obs.OBS_FRONTEND_EVENT_SCENE_COLLECTION_CHANGED:
+            if event == obs.OBS_FRONTEND_EVENT_FINISHED_LOADING:
+                AdvssResolver.unavailable = False               # Plugins are all loaded by now
+            source_snapshots.scenes = fetch_scenes()
+            source_snapshots.sync(profile_sources())
+
+        case obs.OBS_FRONTEND_EVENT_SCENE_COLLECTION_CHANGING | obs.OBS_FRONTEND_EVENT_EXIT:
+            source_snapshots.clear()
+
+
+def parser_fetch_data(sources, deps=None):
+    """ Given a list of source names, builds a data object for use in interpretation
+        If the dependencies of the tree are given, only fetches what can be reached from it
+    """
+    return parser_fetch_shared([(sources, deps)])[0]
+
+
+@timed("fetch")
+def parser_fetch_shared(renders):
+    """ Builds the data objects of several renders, given as (sources, deps) as for parser_fetch_data,
+        fetching each source and global token at most once for all of them
+    """
+    requests = []
+    source_keys = {}
+    shared_tokens = set()
+    advss = AdvssResolver()
+
+    for sources, deps in renders:
+        if deps is None or deps.full:
+            wanted = dict.fromkeys(range(len(sources)))
+            tokens = global_tokens
+        else:
+            wanted = deps.source_keys(sources)
+            tokens = deps.tokens
+            advss.prefetch(deps.advss)
+        requests.append((sources, wanted))
+        shared_tokens.update(tokens)
+
+        for ind, keys in wanted.items():
+            name = sources[ind]
+            if keys is None or source_keys.get(name, set()) is None:
+                source_keys[name] = None
+            else:
+                source_keys[name] = source_keys.get(name, set()) | keys
+
+    fetched = {}
+    for name, keys in source_keys.items():
+        snapshot = source_snapshots.get(name)
+        settings = snapshot.fetch(keys) if snapshot else None
+        if settings is not None:
+            fetched[name] = settings
+
+    shared = {}
+    if "scene" in shared_tokens or "program" in shared_tokens or "preview" in shared_tokens:
+        if source_snapshots.scenes is None:
+            source_snapshots.scenes = fetch_scenes()
+        shared.update(source_snapshots.scenes)
+
+    if "user" in shared_tokens or "username" in shared_tokens:
+        shared["user"]      = os.path.expanduser('~')
+        shared["username"]  = os.path.basename(os.path.expanduser('~'))
+
+    for token, directive in (("day", "%a"), ("Day", "%A"), ("month", "%b"), ("Month", "%B")):
+        if token in shared_tokens:
+            shared[token] = time.strftime(directive)
+
+    results = []
+    for sources, wanted in requests:
+        data = RenderData()
+        data.advss = advss
+        for ind, source_name in enumerate(sources):
+            if ind in wanted and source_name in fetched:
+                data[ind]           = fetched[source_name]
+                data[source_name]   = fetched[source_name]
+        data.update(shared)
+
+        try:
+            data["executable"] = data[0]["executable"]
+        except KeyError:
+            data["executable"] = ""
+        try:
+            data["title"] = data[0]["title"]
+        except KeyError:
+            data["title"] = ""
+        results.append(data)
+
+    return results
+
+
+#### Data snapshots
+###################################################################################################
+
+# With snapshot_capture_file set, each render appends the full data of its sources, its adv-ss variables
+# and the counters before it as a json line, for benchmarks/render.py.
+
+class SnapshotCapture():
+    """ Capture file, opened on the first render captured and written to from every thread that renders
+    """
+    file    = None
+    lock    = threading.Lock()
+
+snapshot_capture = SnapshotCapture()
+
+
+def capture_snapshot(sources, data, counters_before):
+    """ Appends the data of a render to the capture file
+    """
+    snapshot = {"time":     time.time(),
+                "sources":  sources,
+                "data":     {name: data[name] for name in sources if name in data},
+                "tokens":   {token: data[token] for token in global_tokens if token in data},
+                "advss":    data.advss.values,
+                "counters": counters_before,
+                }
+    line = json.dumps(snapshot, separators=(",", ":"), default=dict)   # Lazy settings are read in full
+    with snapshot_capture.lock:
+        try:
+            if snapshot_capture.file is None:
+                snapshot_capture.file = open(config_file_path(snapshot_capture_file), 'a', encoding="utf8")
+            snapshot_capture.file.write(line + "\n")
+            snapshot_capture.file.flush()
+        except OSError as exc:
+            print(f"Snapshot capture failed : {exc}")
+
+
+def close_snapshot_capture():
+    with snapshot_capture.lock:
+        if snapshot_capture.file is not None:
+            snapshot_capture.file.close()
+            snapshot_capture.file = None
+
+
+def snapshot_render_data(snapshot):
+    """ Builds the data object of a captured render back, as parser_fetch_data gave it
+        Adv-ss variables the render didn't resolve are fetched as usual
+    """
+    data = RenderData()
+    for ind, source_name in enumerate(snapshot["sources"]):
+        if source_name in snapshot["data"]:
+            data[ind]           = snapshot["data"][source_name]
+            data[source_name]   = snapshot["data"][source_name]
+    data.update(snapshot["tokens"])
+    data.advss.values = {name: tuple(value) for name, value in snapshot["advss"].items()}
+    return data
+
+
+def key_path(interpreted):
+    """ Splits the content of a value token into the sequence of keys to access
+        e.g. "1[playlist][0][value]" -> (1, "playlist", 0, "value")
+    """
+    inds = interpreted.split("][")
+    startinds = inds[0].split("[")
+    startinds[0] = "0" if startinds[0] == "" else startinds[0]
+    inds = startinds + inds[1:]
+    inds[-1] = inds[-1][:-1] if inds[-1][-1] == "]" else inds[-1]
+
+    path = []
+    for ind in inds:
+        try:
+            path.append(int(ind))
+        except ValueError:
+            path.append(ind)
+    return tuple(path)
+
+
+class ErrCounter():
+    """ Used to track errors happening while interpreting
+    """
+    counter = 0
+
+
+###################################################################################################
+###### Template compiler ##########################################################################
+###################################################################################################
+
+# Compiled templates are nested closures, all called as func(data, err_counter, increase_counters).
+# Static strings are pre-joined and static value keys pre-resolved once in script_update,
+# so rendering never has to walk the parsed tree nor dispatch on node types.
+
+# Zero width whitespaces (mongolian vowel separator, zws, zwnj, zwj, word joiner, zwnbsp)
+zws_table = dict.fromkeys(map(ord, "\u180e\u200B\u200C\u200D\u2060\ufeff")) if remove_zws else {}
+
+
+# Characters the filesystem doesn't allow in filenames, replaced by underscores. Slashes are left for OBS to create folders
+if platform.system() == "Windows":
+    forbidden_characters = '*"<>:|?' + "".join(chr(code) for code in range(32))
+else:
+    forbidden_characters = "\0"
+sanitize_table = {**zws_table, **dict.fromkeys(map(ord, forbidden_characters), "_")}
+
+
+def finish_filename(string, sanitize):
+    """ Applies the filename rules to a generated string, in a single pass
+    """
+    return string.translate(sanitize_table if sanitize else zws_table)
+
+
+def compile_text(tree):
+    """ Compiles a subtree whose output is used as text (exec/if expressions, counter/advss names, value keys)
+        Returns either a plain string if the subtree is static, or a function returning the text
+    """
+    func = compile_tree(tree)
+    if isinstance(func, str):
+        return func.translate(zws_table)
+
+    if not remove_zws:
+        return func
+
+    def text(data, err_counter, increase_counters):
+        return func(data, err_counter, increase_counters).translate(zws_table)
+    return text
+
+
+# Placeholder names standing for the tokens of an expression when they are bound as variables
+bound_name_pattern      = re.compile(r"_advff_(\d+)_")
+bound_literal_pattern   = re.compile(r"\s*(\d+(\.\d*)?([eE][+-]?\d+)?|\.\d+([eE][+-]?\d+)?|True|False|None)\s*")
+
+
+class BindingTransformer(ast.NodeTransformer):
+    """ Replaces the placeholders found inside string literals by concatenations with the placeholder variable
+        Records in `quoted` whether each placeholder was found inside a string literal or as a bare name
+    """
+    def __init__(self):
+        self.quoted = {}
+        self.failed = False
+
+    def split_string(self, string):
+        """ Splits a string around its placeholders, into constants and names
+        """
+        pieces = []
+        pos = 0
+        for match in bound_name_pattern.finditer(string):
+            if match.start() > pos:
+                pieces.append(ast.Constant(string[pos:match.start()]))
+            pieces.append(ast.Name(match.group(), ast.Load()))
+            self.quoted[int(match.group(1))] = True
+            pos = match.end()
+        if pos < len(string):
+            pieces.append(ast.Constant(string[pos:]))
+        return pieces
+
+    def visit_Name(self, node):
+        match = bound_name_pattern.fullmatch(node.id)
+        if match:
+            self.quoted[int(match.group(1))] = False
+            self.failed = self.failed or not isinstance(node.ctx, ast.Load)
+        return node
+
+    def visit_Constant(self, node):
+        if isinstance(node.value, bytes) and bound_name_pattern.search(node.value.decode("utf-8", "replace")):
+            self.failed = True
+        if not (isinstance(node.value, str) and bound_name_pattern.search(node.value)):
+            return node
+
+        pieces = self.split_string(node.value)
+        expr = pieces[0]
+        if isinstance(expr, ast.Name) and len(pieces) == 1:
+            return expr
+        for piece in pieces[1:]:
+            expr = ast.BinOp(expr, ast.Add(), piece)
+        return expr
+
+    def visit_JoinedStr(self, node):
+        values = []
+        for value in node.values:
+            if isinstance(value, ast.Constant):
+                values.extend(piece if isinstance(piece, ast.Constant) else ast.FormattedValue(piece, -1, None)
+                              for piece in self.split_string(value.value))
+            else:
+                values.append(self.visit(value))
+        node.values = values
+        return node
+
+
+def bind_expression(parts, mode):
+    """ Compiles an expression whose tokens are bound as variables instead of spliced in as text
+        Returns (code, quoted), or None if the expression can't be bound and has to be spliced at render time
+    """
+    if any(isinstance(part, str) and bound_name_pattern.search(part) for part in parts):
+        return None
+    source = "".join(part if isinstance(part, str) else f"_advff_{ind}_" for ind, part in enumerate(parts))
+
+    try:
+        tree = ast.parse(source.strip(), mode='eval')
+    except (SyntaxError, ValueError):
+        return None
+
+    transformer = BindingTransformer()
+    tree = ast.fix_missing_locations(transformer.visit(tree))
+    if transformer.failed:
+        return None
+
+    # Placeholders left anywhere else (attribute or keyword names, etc.) can't be bound
+    for node in ast.walk(tree):
+        for field, value in ast.iter_fields(node):
+            if (isinstance(value, str) and bound_name_pattern.search(value)
+                and not (isinstance(node, ast.Name) and bound_name_pattern.fullmatch(value))):
+                return None
+
+    try:
+        WhitelistVisitor(ex_whitelist if mode == "exec" else if_whitelist).visit(tree)
+    except ValueError:
+        return None                             # Reported at render time by the spliced evaluation
+
+    return compile(tree, "<string>", "eval"), transformer.quoted
+
+
+def bound_literal(text):
+    """ Converts the text of a token used outside of quotes in an expression, as long as it is a plain literal
+        Returns (value, True), or (None, False) if the text has to be spliced in the expression
+    """
+    if not bound_literal_pattern.fullmatch(text):
+        return None, False
+    text = text.strip()
+    match text:
+        case "True":
+            return True, True
+        case "False":
+            return False, True
+        case "None":
+            return None, True
+    try:
+        return int(text), True
+    except ValueError:
+        return float(text), True
+
+
+def compile_evaluation(tree, mode):
+    """ Compiles the expression of an exec ("exec" mode) or if ("if" mode) node
+        Returns a function evaluating it, which returns (result, code, expression text)
+    """
+    evaluator = exec_eval if mode == "exec" else if_eval
+    parts = [part.translate(zws_table) if isinstance(part, str) else part
+             for part in compile_parts(tree)]
+
+    if all(isinstance(part, str) for part in parts):
+        expr = "".join(parts)
+
+        def evaluate_static(data, err_counter, increase_counters):
+            return *evaluator(expr), expr
+        return evaluate_static
+
+    binding = bind_expression(parts, mode)
+
+    def evaluate(data, err_counter, increase_counters):
+        values = [part if isinstance(part, str) else part(data, err_counter, increase_counters)
+                  for part in parts]
+        if remove_zws:
+            values = [value.translate(zws_table) for value in values]
+
+        if binding:
+            code, quoted = binding
+            names = {}
+            for ind, part in enumerate(parts):
+                if isinstance(part, str) or ind not in quoted:
+                    continue
+                if quoted[ind]:
+                    names[f"_advff_{ind}_"] = values[ind]
+                    continue
+                names[f"_advff_{ind}_"], bound = bound_literal(values[ind])
+                if not bound:
+                    break
+            else:
+                try:
+                    return budgeted_eval(code, {**(ex_locals if mode == "exec" else if_locals), **names}), 200, "".join(values)
+                except RenderTimeout:
+                    raise RenderTimeout("".join(values).strip()) from None
+                except Exception as ex:
+                    return ex, 422, "".join(values)
+
+        expr = "".join(values)
+        return *evaluator(expr), expr
+    return evaluate
+
+
+def compile_exec(node):
+    """ Compiles an exec node
+    """
+    evaluate = compile_evaluation(node[1], "exec")
+
+    def exec_node(data, err_counter, increase_counters):
+        val, code, interpreted = evaluate(data, err_counter, increase_counters)
+        match code:
+            case 200:
+                return str(val)
+            case 400:
+                print(f"Malformed exec : {interpreted} : {val}")
+            case 405:
+                print(f"Forbidden exec token : {interpreted} : {val}")
+            case 422:
+                print(f"Failed exec : {interpreted} : {val}")
+        err_counter.counter +=1
+        return ""
+    return exec_node
+
+
+def compile_if(node):
+    """ Compiles an if node, a missing else block being compiled as an empty string
+    """
+    evaluate = compile_evaluation(node[1], "if")
+    then_block = as_function(compile_tree(node[2]))
+    else_block = as_function(compile_tree(node[3] if len(node) > 3 else []))
+
+    def if_node(data, err_counter, increase_counters):
+        condition, code, interpreted = evaluate(data, err_counter, increase_counters)
+        match code:
+            case 200:
+                if condition:
+                    return then_block(data, err_counter, increase_counters)
+                return else_block(data, err_counter, increase_counters)
+            case 400:
+                print(f"Malformed if : {interpreted} : {condition}")
+            case 405:
+                print(f"Forbidden if token : {interpreted} : {condition}")
+            case 422:
+                print(f"Failed if : {interpreted} : {condition}")
+        err_counter.counter +=1
+        return ""
+    return if_node
+
+
+def compile_counter(node):
+    """ Compiles a counter node
+    """
+    name = compile_text(node[1])
+
+    if isinstance(name, str):
+        def counter_node(data, err_counter, increase_counters):
+            return counter_eval(name, increase_counters)
+    else:
+        def counter_node(data, err_counter, increase_counters):
+            return counter_eval(name(data, err_counter, increase_counters), increase_counters)
+    return counter_node
+
+
+def compile_advss(node):
+    """ Compiles an adv-ss node
+    """
+    name = compile_text(node[1])
+
+    def advss_node(data, err_counter, increase_counters):
+        interpreted = name if isinstance(name, str) else name(data, err_counter, increase_counters)
+        val, code = data.advss.fetch(interpreted) if isinstance(data, RenderData) else advss_fetch(interpreted)
+        match code:
+            case 200:
+                return val
+            case 404:
+                print(f"Adv-ss variable not found : {interpreted}")
+            case 501:
+                print("Adv-ss not loaded")
+        err_counter.counter +=1
+        return ""
+    return advss_node
+
+
+def compile_value(node):
+    """ Compiles a value node, pre-resolving its key path if it is static
+    """
+    keys = compile_text(node[1])
+
+    if isinstance(keys, str):
+        path = key_path(keys)
+
+        def value_node(data, err_counter, increase_counters):
+            val = data
+            try:
+                for ind in path:
+                    val = val[ind]
+            except KeyError as ex:
+                err_counter.counter +=1
+                print(f"Missing key : {ex} in {keys}")
+                return ""
+            return str(val)
+
+    else:
+        def value_node(data, err_counter, increase_counters):
+            interpreted = keys(data, err_counter, increase_counters)
+            val = data
+            try:
+                for ind in key_path(interpreted):
+                    val = val[ind]
+            except KeyError as ex:
+                err_counter.counter +=1
+                print(f"Missing key : {ex} in {interpreted}")
+                return ""
+            return str(val)
+    return value_node
+
+
+node_compilers = {"exec":       compile_exec,
+                  "if":         compile_if,
+                  "counter":    compile_counter,
+                  "advss":      compile_advss,
+                  "value":      compile_value,
+                  }
+
+
+def as_function(compiled):
+    """ Wraps a static compiled string into a render function
+    """
+    if isinstance(compiled, str):
+        return lambda data, err_counter, increase_counters: compiled
+    return compiled
+
+
+def compile_parts(tree):
+    """ Compiles each node of a parsed tree, joining consecutive strings
+        Returns a list of plain strings and render functions
+    """
+    parts = []
+    for node in tree:
+        if node[0] == "string":
+            if parts and isinstance(parts[-1], str):
+                parts[-1] += node[1]
+            else:
+                parts.append(node[1])
+        else:
+            part = node_compilers[node[0]](node)
+            parts.append(timed(f"token.{node[0]}")(part) if callable(part) else part)
+    return parts
+
+
+def compile_tree(tree):
+    """ Compiles a parsed tree into a render function
+        Returns a plain string instead if the tree has no dynamic node
+    """
+    parts = compile_parts(tree)
+
+    if not parts:
+        return ""
+    if len(parts) == 1:
+        return parts[0]
+
+    funcs = tuple(as_function(part) for part in parts)
+
+    def render(data, err_counter, increase_counters):
+        return "".join([func(data, err_counter, increase_counters) for func in funcs])
+    return render
+
+
+@timed("render")
+def render_template(template, data, err_counter=None, increase_counters=True, sanitize=False):
+    """ Renders a compiled template into a filename
+    """
+    if isinstance(template, str):
+        return_string = template
+    else:
+        return_string = template(data, err_counter or ErrCounter(), increase_counters)
+
+    if isinstance(data, RenderData):
+        data.advss.release()
+
+    return finish_filename(return_string, sanitize)
+
+
+###################################################################################################
+###### Partial evaluation #########################################################################
+###################################################################################################
+
+# Exec and if blocks which only depend on constants and cheap, non-volatile calls are evaluated once
+# when the formatting is parsed, and replaced by their result.
+
+volatile_locals = ("random", "time")    # Their results change between calls
+cheap_calls = {"str", "int", "float", "bool", "abs", "round", "len", "min", "max",
+               "upper", "lower", "title", "capitalize", "casefold", "strip", "lstrip", "rstrip",
+               "startswith", "endswith", "isdigit", "isalpha", "floor", "ceil", "trunc", "fabs", "sqrt",
+               "exp", "log", "log10", "sin", "cos", "tan"}
+
+def static_text(tree):
+    """ Returns the text of a tree made only of strings as it would be evaluated, or None if it has other nodes
+    """
+    if any(node[0] != "string" for node in tree):
+        return None
+    return "".join(node[1] for node in tree).translate(zws_table)
+
+
+def is_pure(expr, local_names):
+    """ Whether an expression only uses the given non-volatile locals (and its own comprehension variables)
+    """
+    try:
+        tree = ast.parse(expr.strip(), mode='eval')
+    except (SyntaxError, ValueError):
+        return False
+
+    names = [node for node in ast.walk(tree) if isinstance(node, ast.Name)]
+    own_names = {node.id for node in names if isinstance(node.ctx, ast.Store)}
+    return all(node.id in own_names or (node.id in local_names and node.id not in volatile_locals)
+               for node in names)
+
+
+cheap_nodes = (ast.Expression, ast.Constant, ast.Name, ast.Attribute, ast.Subscript, ast.Slice, ast.Tuple, ast.List,
+               ast.Set, ast.Dict, ast.Compare, ast.BoolOp, ast.UnaryOp, ast.IfExp, ast.JoinedStr, ast.FormattedValue,
+               ast.BinOp, ast.Call, ast.keyword, ast.operator, ast.cmpop, ast.boolop, ast.unaryop, ast.expr_context)
+
+
+def numeric_constant(node):
+    """ Value of a number literal, possibly signed, or None
+    """
+    if isinstance(node, ast.UnaryOp) and isinstance(node.op, (ast.USub, ast.UAdd)):
+        node = node.operand
+    if isinstance(node, ast.Constant) and isinstance(node.value, (int, float)) and not isinstance(node.value, bool):
+        return node.value
+    return None
+
+
+def is_cheap(expr):
+    """ Whether an expression is sure to evaluate quickly, so that it can be evaluated when the formatting is set:
+        no loop, comprehension or call other than cheap_calls, and operators that can build huge values
+        (powers, shifts, repetitions, string formatting) only applied to small literals
+    """
+    try:
+        tree = ast.parse(expr.strip(), mode='eval')
+    except (SyntaxError, ValueError):
+        return False
+
+    for node in ast.walk(tree):
+        if not isinstance(node, cheap_nodes):
+            return False
+        if isinstance(node, ast.Call):
+            name = node.func.id if isinstance(node.func, ast.Name) else getattr(node.func, "attr", None)
+            if name not in cheap_calls:
+                return False
+        elif isinstance(node, ast.FormattedValue) and node.format_spec is not None:
+            return False
+        elif isinstance(node, ast.BinOp) and isinstance(node.op, (ast.Pow, ast.LShift, ast.Mult, ast.Mod)):
+            right = numeric_constant(node.right)
+            repeated = (isinstance(node.op, ast.Mult) and isinstance(node.left, ast.Constant)
+                        and isinstance(node.left.value, str))
+            if right is None or (not repeated and numeric_constant(node.left) is None):
+                return False
+            if (repeated or isinstance(node.op, (ast.Pow, ast.LShift))) and abs(right) > 1000:
+                return False
+    return True
+
+
+def fold_tree(tree):
+    """ Partially evaluates a parsed tree, replacing the blocks that only depend on constants by their result
+    """
+    folded = []
+    for node in tree:
+        match node[0]:
+            case "string":
+                result = [node]
+
+            case "value" | "counter" | "advss":
+                result = [(node[0], fold_tree(node[1]))]
+
+            case "exec":
+                expr = fold_tree(node[1])
+                result = [("exec", expr)]
+                text = static_text(expr)
+                if text is not None and is_pure(text, ex_locals) and is_cheap(text):
+                    val, code = exec_eval(text)
+                    if code == 200:
+                        result = [("string", str(val))]
+
+            case "if":
+                cond = fold_tree(node[1])
+                blocks = [fold_tree(block) for block in node[2:]]
+                result = [("if", cond, *blocks)]
+                text = static_text(cond)
+                if text is not None and is_pure(text, if_locals) and is_cheap(text):
+                    condition, code = if_eval(text)
+                    if code == 200:
+                        result = blocks[0] if condition else (blocks[1] if len(blocks) > 1 else [])
+
+        for new_node in result:
+            if new_node[0] == "string" and folded and folded[-1][0] == "string":
+                folded[-1] = ("string", folded[-1][1] + new_node[1])
+            elif new_node != ("string", ""):
+                folded.append(new_node)
+    return folded
+
+
+def tree_to_string(tree):
+    """ Rebuilds a formatting string from a parsed tree
+    """
+    dlm = token_delimiter
+    string = ""
+    for node in tree:
+        match node[0]:
+            case "string":
+                string += node[1]
+            case "value" | "counter" | "advss":
+                string += f"{node[0][0]}{dlm}{tree_to_string(node[1])}{dlm}"
+            case "exec":
+                string += f"{dlm}exec{dlm}{tree_to_string(node[1])}{dlm}end{dlm}"
+            case "if":
+                string += f"{dlm}if{dlm}{tree_to_string(node[1])}{dlm}then{dlm}{tree_to_string(node[2])}"
+                if len(node) > 3:
+                    string += f"{dlm}else{dlm}{tree_to_string(node[3])}"
+                string += f"{dlm}end{dlm}"
+    return string
+
+
+###################################################################################################
+###### Template analysis ##########################################################################
+###################################################################################################
+
+# Reports what a parsed tree references and what rendering it can cost, without fetching or evaluating
+# anything. Names only known at render time are reported as dynamic, and the costs are upper bounds:
+# the source snapshots, the text file cache and the expression cache spare most of them after a first render.
+
+file_reading_sources = ("text_ft2_source", "text_gdiplus")    # Types whose source_post_process reads a file
+
+class TemplateReport():
+    """ Result of analyze_tree
+        counters    : counter names known statically
+        dynamic     : kinds of token ("counter", "advss", "value") whose name or key is only known at render time
+        deps        : dependencies of the tree, for its sources, keys, global tokens and adv-ss variables
+        expressions : (mode, expression, problem, detail, certain) of the exec/if expressions that would fail,
+                      certain being False when tokens spliced in at render time could still change the outcome
+        compiles    : expressions compiled on every render, their tokens not being bindable as variables
+    """
+    def __init__(self, tree):
+        self.counters       = set()
+        self.dynamic        = set()
+        self.deps           = tree_dependencies(tree)
+        self.expressions    = []
+        self.compiles       = 0
+        self.dynamic_advss  = 0
+        self.static_length  = sum(len(node[1].encode("utf-8")) for node in tree if node[0] == "string")
+
+
+def expression_problem(source, mode):
+    """ Returns (problem, detail) if an expression would fail, else None: "malformed" with the syntax error,
+        "forbidden" with the node type refused by the whitelist, or "unknown name" with a name absent from the locals
+    """
+    try:
+        node = ast.parse(source.strip(), mode='eval')
+    except (SyntaxError, ValueError) as exc:
+        return "malformed", str(exc)
+    try:
+        WhitelistVisitor(ex_whitelist if mode == "exec" else if_whitelist).visit(node)
+    except ValueError as exc:
+        return "forbidden", exc.args[0].__name__
+
+    names = [name for name in ast.walk(node) if isinstance(name, ast.Name)]
+    own_names = {name.id for name in names if isinstance(name.ctx, ast.Store)}
+    for name in names:
+        if (name.id not in own_names and name.id not in (ex_locals if mode == "exec" else if_locals)
+            and not bound_name_pattern.fullmatch(name.id)):
+            return "unknown name", name.id
+    return None
+
+
+def analyze_expression(mode, tree, report):
+    """ Checks an exec/if expression, its tokens standing as variables the way they get bound
+    """
+    text = static_text(tree)
+    if text is not None:
+        problem = expression_problem(text, mode)
+        if problem:
+            report.expressions.append((mode, text.strip(), *problem, True))
+        return
+
+    # Tokens used outside of quotes are only bound if their value is a plain literal, spliced in otherwise
+    parts = [part.translate(zws_table) if isinstance(part, str) else part for part in compile_parts(tree)]
+    binding = bind_expression(parts, mode)
+    if binding is None or not all(binding[1].values()):
+        report.compiles += 1
+
+    source = "".join(part if isinstance(part, str) else f"_advff_{ind}_" for ind, part in enumerate(parts))
+    problem = expression_problem(source, mode)
+    if problem and problem[0] != "malformed":       # A malformed one might be completed by its tokens' text
+        report.expressions.append((mode, tree_to_string(tree).strip(), *problem, False))
+
+
+def analyze_tree(tree, report=None):
+    """ Walks a parsed tree, returns its TemplateReport
+    """
+    if report is None:
+        report = TemplateReport(tree)
+    for node in tree:
+        if node[0] == "string":
+            continue
+        for subtree in node[1:]:
+            analyze_tree(subtree, report)
+
+        match node[0]:
+            case "counter":
+                name = static_text(node[1])
+                if name is None:
+                    report.dynamic.add("counter")
+                else:
+                    report.counters.add(name)
+            case "advss":
+                if static_text(node[1]) is None:
+                    report.dynamic.add("advss")
+                    report.dynamic_advss += 1
+            case "value":
+                if static_text(node[1]) is None:
+                    report.dynamic.add("value")
+            case "exec" | "if":
+                analyze_expression(node[0], node[1], report)
+    return report
+
+
+def estimate_cost(report, sources):
+    """ Upper bounds of the calls a render of the analysed tree makes with the given sources, from the
+        source snapshots already held: sources never fetched yet are left out
+    """
+    deps = report.deps
+    wanted = dict.fromkeys(range(len(sources))) if deps.full else deps.source_keys(sources)
+    source_keys = {}
+    for ind, keys in wanted.items():
+        name = sources[ind]
+        if keys is None or source_keys.get(name, set()) is None:
+            source_keys[name] = None
+        else:
+            source_keys[name] = source_keys.get(name, set()) | keys
+
+    procs = len(deps.advss) + report.dynamic_advss
+    file_reads = 0
+    for name, keys in source_keys.items():
+        snapshot = source_snapshots.entries.get(name)
+        if snapshot is None:
+            continue
+        procs += sum(1 for items in snapshot.procs.values() if keys is None or any(key in keys for _, key in items))
+        if snapshot.kind in file_reading_sources and snapshot.needs_settings(keys):
+            file_reads += 1
+
+    available_length = 255 - 10             # As in valid_formatted_length
+    truncations = 1 if report.static_length <= available_length else 1 + report.static_length.bit_length()
+
+    return {"proc calls": procs, "file reads": file_reads, "truncation calls": truncations,
+            "expression compiles": report.compiles}
+
+
+def report_lines(report, sources):
+    """ Readable summary of a TemplateReport, one line per item
+    """
+    lines = []
+    if report.counters:
+        lines.append(f"Counters : {', '.join(sorted(report.counters))}")
+
+    for ref, keys in report.deps.sources.items():
+        if isinstance(ref, int):
+            name = sources[ref] if ref < len(sources) else f"source {ref}, not in the list"
+        else:
+            name = ref if ref in sources else f"{ref}, not in the list"
+        lines.append(f"{name} : {'all keys' if keys is None else ', '.join(sorted(map(str, keys)))}")
+    if report.deps.full:
+        lines.append("Sources : any key, some key is only known at render time")
+
+    if report.deps.tokens:
+        lines.append(f"Tokens : {', '.join(sorted(report.deps.tokens))}")
+    if report.deps.advss:
+        lines.append(f"Adv-ss variables : {', '.join(sorted(report.deps.advss))}")
+    if report.dynamic:
+        kinds = {"counter": "counter names", "advss": "adv-ss variable names", "value": "source keys"}
+        lines.append(f"Only known at render time : {', '.join(kinds[kind] for kind in sorted(report.dynamic))}")
+
+    for mode, expr, problem, detail, certain in report.expressions:
+        lines.append(f"{mode.capitalize()} token, {problem} : {detail}{'' if certain else ' (unless its tokens change it)'} : {expr}")
+
+    cost = estimate_cost(report, sources)
+    lines.append("Per render, at most : " + ", ".join(f"{count} {kind}" for kind, count in cost.items()))
+    return lines
 
 
 ###################################################################################################
-###### Interpreter ################################################################################
+###### Template cache #############################################################################
 ###################################################################################################
 
-class Counters():
-    """Holds the values of the counters and the currently selected one
-    """
-    data = {}
-    selected = None
+# Parsed trees of the formattings, saved in script_save and loaded back in script_load. Folding and
+# compiling are redone from the cached tree. Any entry that fails a check is dropped.
 
-counters = Counters()
+template_cache_file = "adv-ff_templates.json"
+template_cache_size = 64
 
-def exec_eval(expr):
-    """ Checks for validity and legality of exec token statement then evaluates it
+node_arities = {"string": (1,), "value": (1,), "counter": (1,), "advss": (1,), "exec": (1,), "if": (2, 3)}
+
+
+class TemplateCache():
+    """ LRU of the cache entries by key, None until loaded
     """
-    class Visitor(ast.NodeVisitor):
-        def visit(self, node):
-            if not isinstance(node, ex_whitelist):
-                raise ValueError(type(node))
-            return super().visit(node)
+    entries = None
+    dirty   = False
+    lock    = threading.RLock()
 
-    try:
-        node = ast.parse(expr.strip(), mode='eval')
-    except SyntaxError as ex:
-        return ex, 400
+template_cache = TemplateCache()
 
-    try:
-        Visitor().visit(node)
-    except ValueError as ex:
-        return ex, 405
 
-    try:
-        return eval(compile(node, "<string>", "eval"), {'__builtins__': None}, ex_locals), 200
-    except Exception as ex:
-        return ex, 422
+def template_cache_key(string):
+    """ Hash of everything the parsed tree depends on
+    """
+    script_version = ('.').join((str(n) for _, n in version.items()))
+    return hashlib.sha256(json.dumps([string, token_delimiter, script_version]).encode("utf-8")).hexdigest()
 
 
-def if_eval(expr):
-    """ Checks for validity and legality of if token condition then evaluates it
+def tree_checksum(tree):
+    return hashlib.sha256(json.dumps(tree).encode("utf-8")).hexdigest()
+
+
+def tree_from_json(tree):
+    """ Rebuilds a parsed tree from its json form, raises ValueError if it isn't a valid tree
     """
-    class Visitor(ast.NodeVisitor):
-        def visit(self, node):
-            if not isinstance(node, if_whitelist):
-                raise ValueError(node)
-            return super().visit(node)
+    if not isinstance(tree, list):
+        raise ValueError(f"Not a tree : {tree!r}")
+    nodes = []
+    for node in tree:
+        if not (isinstance(node, list) and node and len(node) - 1 in node_arities.get(node[0], ())):
+            raise ValueError(f"Not a node : {node!r}")
+        if node[0] == "string":
+            if not isinstance(node[1], str):
+                raise ValueError(f"Not a string node : {node!r}")
+            nodes.append(("string", node[1]))
+        else:
+            nodes.append((node[0], *(tree_from_json(subtree) for subtree in node[1:])))
+    return nodes
 
-    try:
-        node = ast.parse(expr.strip(), mode='eval')
-    except SyntaxError as ex:
-        return ex, 400
 
+def load_template_cache():
+    """ Loads the cache file, keeping only the entries that pass the integrity checks
+    """
+    template_cache.entries = collections.OrderedDict()
+    template_cache.dirty = False
+    if not template_cache_file:
+        return
     try:
-        Visitor().visit(node)
-    except ValueError as ex:
-        return ex, 405
+        with open(config_file_path(template_cache_file), 'rt', encoding="utf8") as file:
+            stored = json.load(file)
+    except FileNotFoundError:
+        return
+    except (OSError, ValueError) as exc:
+        print(f"Template cache unreadable, ignoring it : {exc}")
+        return
 
-    try:
-        return eval(compile(node, "<string>", "eval"), {'__builtins__': None}, if_locals), 200
-    except Exception as ex:
-        return ex, 422
+    for key, entry in (stored.items() if isinstance(stored, dict) else ()):
+        try:
+            if (key != template_cache_key(entry["format"])
+                or entry["checksum"] != tree_checksum(entry["tree"])):
+                raise ValueError("key or checksum mismatch")
+            template_cache.entries[key] = {"format": entry["format"], "tree": tree_from_json(entry["tree"])}
+        except (KeyError, TypeError, ValueError) as exc:
+            print(f"Template cache entry dropped : {exc}")
+            template_cache.dirty = True
+    evict_template_cache()
 
 
-def counter_eval(counter_id, increase=True):
-    """ Returns the current value of the specified counter, incrementing it if needed
+def evict_template_cache():
+    while len(template_cache.entries) > template_cache_size:
+        template_cache.entries.popitem(last=False)
+        template_cache.dirty = True
+
+
+def save_template_cache(strings):
+    """ Writes the entries of the given formattings to the cache file, dropping the others
     """
+    if not template_cache_file or template_cache.entries is None:
+        return
+    keys = {template_cache_key(string) for string in strings}
+    with template_cache.lock:
+        if not template_cache.dirty and keys == set(template_cache.entries):
+            return
+        stored = {key: {"format": entry["format"], "tree": entry["tree"], "checksum": tree_checksum(entry["tree"])}
+                  for key, entry in template_cache.entries.items() if key in keys}
     try:
-        value = counters.data[counter_id]
-        if increase:
-            counters.data[counter_id] += 1
+        path = config_file_path(template_cache_file)
+        with open(f"{path}.tmp", 'w', encoding="utf8") as file:
+            json.dump(stored, file)
+        os.replace(f"{path}.tmp", path)
+        template_cache.dirty = False
+    except OSError as exc:
+        print(f"Template cache couldn't be saved : {exc}")
 
-    except KeyError:
-        value = 0
-        counters.data[counter_id] = int(increase)
 
-    return str(value)
+def cached_parse(string):
+    """ parse_format, through the template cache
+    """
+    if not template_cache_file:
+        return parse_format(string)
+    key = template_cache_key(string)
+    with template_cache.lock:
+        if template_cache.entries is None:
+            load_template_cache()
+        entry = template_cache.entries.get(key)
+        if entry and entry["format"] == string:
+            template_cache.entries.move_to_end(key)
+            return entry["tree"]
 
+    tree = parse_format(string)
+    with template_cache.lock:
+        template_cache.entries[key] = {"format": string, "tree": tree}
+        template_cache.dirty = True
+        evict_template_cache()
+    return tree
 
-def advss_fetch(name):
-    """ Fetches and returns the value of the adv-ss variable with name `name`
-    """
-    proc_handler = obs.obs_get_proc_handler()
-    data = obs.calldata_create()
-    obs.calldata_set_string(data, "name", str(name))    # As far as I can see there is no python object that fails to convert to str so no need to guard this
-    obs.proc_handler_call(proc_handler, "advss_get_variable_value", data)
 
-    if obs.calldata_bool(data, "success"):
-        value = obs.calldata_string(data, "value")
-        obs.calldata_destroy(data)
-        return value, 200
 
-    if obs.calldata_string(data, "success") is None:    # Adv-ss plugin not loaded. (Note that I do not guarantee the validity and future-proofness of this method)
-        obs.calldata_destroy(data)
-        return "", 501
 
-    obs.calldata_destroy(data)
-    return "", 404
+###################################################################################################
+###### Parsers ####################################################################################
+###################################################################################################
 
 
-def parser_fetch_data(sources):
-    """ Given a list of source names, builds a data object for use in interpretation
+class Parser():
+    """ Used to hold persistent data for the parsers, one per formatter profile
+        The tree, template, deps and sources are swapped under the lock, and read together by the renders
     """
-    data = {}
-    for ind, source_name in enumerate(sources):
-        source = obs.obs_get_source_by_name(source_name)
-        if source:
-            source_data     = obs.obs_source_get_settings(source)
-            settings        = json.loads(obs.obs_data_get_json_with_defaults(source_data))
-            obs.obs_data_release(source_data)
-
-            settings["width"]       = obs.obs_source_get_width(source)
-            settings["height"]      = obs.obs_source_get_height(source)
-            settings["muted"]       = obs.obs_source_muted(source)
-            settings["active"]      = obs.obs_source_active(source)
-            settings["showing"]     = obs.obs_source_showing(source)
-
-            sid = obs.obs_source_get_unversioned_id(source)
-            if sid in source_fetch_proc:
-                for proc, items in source_fetch_proc[sid].items():
-                    cd = obs.calldata_create()
-                    obs.proc_handler_call(obs.obs_source_get_proc_handler(source),
-                                          proc, cd)
-                    for func, key in items:
-                        settings[key] = calldata_fetchers[func](cd, key)
-                    obs.calldata_destroy(cd)
+    oldformat   = None
+    sources     = []
+    tree        = []
+    template    = ""
+    deps        = None
+    output      = None              # Name of the output of an additional profile, None for the frontend's
+    string      = None              # Formatting the tree was built from
 
-            source_post_process(source, settings)
+    def __init__(self, name, group=None):
+        self.name   = name
+        self.group  = group         # Profiles of a same group share the data fetched for them, see profile_filename
+        self.lock   = threading.Lock()
 
-            data[ind]           = settings
-            data[source_name]   = settings
 
-        obs.obs_source_release(source)
+format_memo_size = 32
 
-    current_scene       = obs.obs_frontend_get_current_scene()
-    current_preview     = obs.obs_frontend_get_current_preview_scene()
-    data["user"]        = os.path.expanduser('~')
-    data["username"]    = os.path.basename(os.path.expanduser('~'))
-    data["scene"]       = obs.obs_source_get_name(current_scene)
-    if current_preview:
-        data["program"] = obs.obs_source_get_name(current_scene)
-        data["preview"] = obs.obs_source_get_name(current_preview)
-    else:
-        data["program"] = ""
-        data["preview"] = ""
-    obs.obs_source_release(current_scene)
-    obs.obs_source_release(current_preview)
+class FormatMemo():
+    """ LRU of what was built from the formattings, keyed on (formatting, engine, persist)
+    """
+    entries = collections.OrderedDict()
+    lock    = threading.Lock()
 
-    data["day"] = time.strftime("%a")
-    data["Day"] = time.strftime("%A")
-    data["month"] = time.strftime("%b")
-    data["Month"] = time.strftime("%B")
+format_memo = FormatMemo()
+
+
+def parsed_format(string, engine=None, persist=True):
+    """ Returns (tree, template, deps) built from a formatting, or None if it is malformed
+        Without persist, the formatting is kept out of the template cache, e.g. one still being typed
+    """
+    engine = engine or parser_engine
+    if engine == "pyparsing" and not pyparsing_available():     # parse_format would fall back to the native parser
+        engine = "native"
+    key = (string, engine, persist)
+    with format_memo.lock:
+        if key in format_memo.entries:
+            format_memo.entries.move_to_end(key)
+            return format_memo.entries[key]
 
     try:
-        data["executable"] = data[0]["executable"]
-    except KeyError:
-        data["executable"] = ""
-    try:
-        data["title"] = data[0]["title"]
-    except KeyError:
-        data["title"] = ""
+        tree = fold_tree(cached_parse(string) if persist and engine == parser_engine else parse_format(string, engine))
+        built = (tree, compile_tree(tree), tree_dependencies(tree))
+    except ParseError:
+        built = None
 
-    return data
+    with format_memo.lock:
+        format_memo.entries[key] = built
+        while len(format_memo.entries) > format_memo_size:
+            format_memo.entries.popitem(last=False)
+    return built
 
 
-class ErrCounter():
-    """ Used to track errors happening while interpreting
+def parser_tree_from_string(parser, string):
+    """ Creates parsed tree from string
     """
-    counter = 0
+    built = parsed_format(string)
+    if built is None:
+        tree = template = deps = None
+    else:
+        tree, template, deps = built
+
+    with parser.lock:
+        parser.tree, parser.template, parser.deps, parser.string = tree, template, deps, string
+
 
-def interpreter(tree, data, err_counter=ErrCounter(), increase_counters=True, sanitize=False):
-    """ Builds an interpreted string from a parsed tree and data
-        Works recursively on the tree
+def parsers_fetch(renders):
+    """ Fetches the data of (sources, template, deps) renders at once, in full while capturing snapshots
     """
-    return_string = ""
-    for node in tree:
-        match node[0]:
+    capture = bool(snapshot_capture_file)
+    return parser_fetch_shared([(sources, None if capture else deps) for sources, _, deps in renders])
 
-            case "string":
-                return_string += node[1]
 
-            case "exec":
-                interpreted = interpreter(node[1], data, err_counter, increase_counters)
-                val, code = exec_eval(interpreted)
-                match code:
-                    case 200:
-                        return_string += str(val)
-                    case 400:
-                        err_counter.counter +=1
-                        print(f"Malformed exec : {interpreted} : {val}")
-                    case 405:
-                        err_counter.counter +=1
-                        print(f"Forbidden exec token : {interpreted} : {val}")
-                    case 422:
-                        err_counter.counter +=1
-                        print(f"Failed exec : {interpreted} : {val}")
+def parsers_interpret(parsers, datas=None):
+    """ Fetches the data of all the parsers at once and returns their interpreted strings, in the same order,
+        each along with the reservation of the counter values it took
+        The data is only fetched if not given, see profile_filename
+        Past render_deadline, OBS's own filename formattings are returned instead
+    """
+    apply_pending_formats()
+    renders = []
+    for parser in parsers:
+        with parser.lock:
+            renders.append((parser.sources, parser.template, parser.deps))
+    capture = bool(snapshot_capture_file)
+
+    results = []
+    try:
+        with RenderBudget(render_deadline), CounterReservation():      # Given back as a whole past the deadline
+            if datas is None:
+                datas = parsers_fetch(renders)
+            for parser, (sources, template, _), data in zip(parsers, renders, datas):
+                if capture:
+                    with counters.lock:
+                        counters_before = dict(counters.data)
+                with CounterReservation() as reservation:
+                    file_format = render_template(template, data, increase_counters=True, sanitize=True)
+                if capture:
+                    capture_snapshot(sources, data, counters_before)
+                results.append((file_format[:valid_formatted_length(file_format)], reservation))
+    except RenderTimeout as exc:
+        print(f"{', '.join(parser.name for parser in parsers)} : filename generation exceeded {render_deadline}s "
+              f"while evaluating {str(exc)!r}, using OBS's filename formatting")
+        results = [(fallback_filename(parser), CounterReservation()) for parser in parsers]
+
+    sync_counter_journal()
+    return results
+
+
+#### Formatting updates
+###################################################################################################
 
-            case "if":
-                interpreted = interpreter(node[1], data, err_counter, increase_counters)
-                condition, code = if_eval(interpreted)
-                match code:
-                    case 200:
-                        if condition:
-                            return_string += interpreter(node[2], data, err_counter)
-                        else:
-                            return_string += interpreter(node[3], data, err_counter)
-                    case 400:
-                        err_counter.counter +=1
-                        print(f"Malformed if : {interpreted} : {condition}")
-                    case 405:
-                        err_counter.counter +=1
-                        print(f"Forbidden if token : {interpreted} : {condition}")
-                    case 422:
-                        err_counter.counter +=1
-                        print(f"Failed if : {interpreted} : {condition}")
+# OBS calls script_update on every keystroke in the formatting fields. A formatting being typed is only
+# parsed once it stayed unchanged for format_debounce, or right away if a filename is needed before that.
 
-            case "counter":
-                interpreted = interpreter(node[1], data, err_counter, increase_counters)
-                return_string += counter_eval(interpreted, increase_counters)
+format_debounce = 0.4               # Seconds
 
-            case "advss":
-                interpreted = interpreter(node[1], data, err_counter, increase_counters)
-                val, code = advss_fetch(interpreted)
-                match code:
-                    case 200:
-                        return_string += val
-                    case 404:
-                        err_counter.counter +=1
-                        print(f"Adv-ss variable not found : {interpreted}")
-                    case 501:
-                        err_counter.counter +=1
-                        print(f"Adv-ss not loaded")
+class PendingFormats():
+    """ Formattings waiting for the debounce timer, by parser
+        The lock is held while they get parsed, so that an older one can't replace a newer one
+    """
+    entries = {}
+    lock    = threading.Lock()
 
+pending_formats = PendingFormats()
 
-            case "value":
-                try:
-                    interpreted = interpreter(node[1], data, err_counter, increase_counters)
-                    inds = interpreted.split("][")
-                    startinds = inds[0].split("[")
-                    startinds[0] = "0" if startinds[0] == "" else startinds[0]
-                    inds = startinds + inds[1:]
-                    inds[-1] = inds[-1][:-1] if inds[-1][-1] == "]" else inds[-1]
 
-                    val = data
-                    for ind in inds:
-                        try:
-                            val = val[int(ind)]
-                        except ValueError:
-                            val = val[ind]
+def update_format(parser, string):
+    """ Schedules the parsing of a formatting that changed, or parses it right away on the first update
+    """
+    with pending_formats.lock:
+        if string == pending_formats.entries.get(parser, parser.string):
+            return
+        if string == parser.string:                 # Typed back to the formatting in use
+            del pending_formats.entries[parser]
+            return
+        if not format_debounce or parser.string is None:
+            pending_formats.entries.pop(parser, None)
+            parser_tree_from_string(parser, string)
+            return
+        pending_formats.entries[parser] = string
 
-                except KeyError as ex:
-                    err_counter.counter +=1
-                    print(f"Missing key : {ex} in {interpreted}")
-                    val = ""
-                return_string += str(val)
+    obs.timer_remove(pending_formats_timer_cb)
+    obs.timer_add(pending_formats_timer_cb, int(format_debounce * 1000))
 
-    if sanitize:
-        return_string = re.sub(r"[\*\"<>:\|\?]", "_", return_string)
 
-    if remove_zws:
-        return_string = re.sub(r"[\u180e\u200B\u200C\u200D\u2060\ufeff]", "", return_string)
+def pending_formats_timer_cb():
+    obs.timer_remove(pending_formats_timer_cb)
+    apply_pending_formats()
+    render_pending_previews()
 
-    return return_string
 
+def apply_pending_formats():
+    """ Parses the formattings still waiting for the timer
+    """
+    if not pending_formats.entries:
+        return
+    with pending_formats.lock:
+        for parser, string in pending_formats.entries.items():
+            parser_tree_from_string(parser, string)
+        pending_formats.entries.clear()
 
-###################################################################################################
-###### Parsers ####################################################################################
+
+#### Render deadline
 ###################################################################################################
 
+# The exec and if evaluations of a render stop once past render_deadline, see RenderBudget.
+# Fetching the sources and a single builtin call can't be interrupted.
 
-class Parser():
-    """ Used to hold persistent data for the parsers
+def fallback_filename(parser):
+    """ OBS's own filename formatting for the parser's output
     """
-    oldformat   = None
-    sources     = []
-    tree        = []
+    if parser.oldformat is not None:
+        return parser.oldformat
+    return obs.config_get_string(obs.obs_frontend_get_profile_config(), "Output", "FilenameFormatting") or ""
+
+
+native_auto_split = True            # Leaves Size/Time splits to OBS, naming the next file after each one
 
 class Splitfile():
     """ Holds data about filesplitting settings
@@ -747,10 +3022,13 @@ class Splitfile():
     hotkey          = HotkeyOverride()
     current_file    = None
     split_pending   = False
+    prerender       = False
+    reservation     = None
+    lock            = threading.Lock()      # Held while prerendering, so that a name and its reservation go together
 
 
 ############################# Recording output parser
-rec_parser = Parser()
+rec_parser = Parser("Recording", "recording")
 split_file = Splitfile()
 
 def split_file_done_callback(*args):
@@ -758,6 +3036,36 @@ def split_file_done_callback(*args):
     """
     split_file.current_file = obs_frontend_get_last_recording()
     split_file.split_pending = False
+    if split_file.prerender:
+        split_file_prerender()
+
+
+def split_file_prerender():
+    """ Renders the name of the next split file ahead of time, for OBS's own filesplitting to use
+    """
+    with split_file.lock:
+        if not split_file.prerender:            # The recording stopped meanwhile
+            return
+        with CounterReservation() as reservation:
+            file_format = rec_parser_interpret()
+        split_file.reservation = reservation
+
+        rec = obs.obs_frontend_get_recording_output()
+        data = obs.obs_output_get_settings(rec)
+        obs.obs_data_set_string(data, 'format', file_format)
+        obs.obs_data_release(data)
+        obs.obs_output_release(rec)
+
+
+def split_file_rollback():
+    """ Stops prerendering and reverts the counters increased by the last prerendered name, which no file ended up using
+    """
+    with split_file.lock:
+        split_file.prerender = False
+        if split_file.reservation is not None:
+            split_file.reservation.rollback()
+            split_file.reservation = None
+    sync_counter_journal()
 
 
 @obs_hotkey_func
@@ -798,21 +3106,20 @@ def split_file_auto_callback(*args):
         obs.obs_frontend_recording_split_file()
 
 
-def rec_parser_interpret():
+@timed("recording")
+def rec_parser_interpret(grouped=False):
     """ Fetches data and returns interpreted string
+        With grouped, the data is fetched along the other profiles of the recording group, see profile_filename
     """
-    data = parser_fetch_data(rec_parser.sources)
-    file_format = interpreter(rec_parser.tree, data, increase_counters=True, sanitize=(platform.system()=="Windows"))
-    return file_format[:valid_formatted_length(file_format)]
+    if grouped:
+        return profile_filename(rec_parser)
+    return parsers_interpret([rec_parser])[0][0]
 
 
 def rec_parser_tree_from_string(string):
     """ Creates parsed tree from string
     """
-    try:
-        rec_parser.tree = grammar.parse_string(string, True)
-    except pp.exceptions.ParseException:
-        rec_parser.tree = None
+    parser_tree_from_string(rec_parser, string)
 
 
 def rec_parser_apply_cb(event):
@@ -826,34 +3133,43 @@ def rec_parser_apply_cb(event):
                                                          "FilenameFormatting") or ""
             if flags.record_enabled:
                 obs.config_set_string(config, "Output",
-                                      "FilenameFormatting", rec_parser_interpret())
+                                      "FilenameFormatting", rec_parser_interpret(grouped=True))
 
                 if (obs.config_get_string(config, "Output", "Mode") == "Advanced"
                     and obs.config_get_bool(config, "AdvOut", "RecSplitFile")):
-                    # If one of the non-manual filesplitting types was selected, change to manual
-                    # and divert the check for filesplitting to our own function
-                    split_file.hotkey.activate(True)
-                    split_file.old_mode = obs.config_get_string(config, "AdvOut", "RecSplitFileType")
-                    obs.config_set_string(config, "AdvOut", "RecSplitFileType", "Manual")
-
                     rec = obs.obs_frontend_get_recording_output()
                     obs.signal_handler_connect(obs.obs_output_get_signal_handler(rec),
                                                "file_changed", split_file_done_callback)
                     obs.obs_output_release(rec)
 
-                    match split_file.old_mode:
-                        case "Time":
-                            obs.timer_add(split_file_auto_callback,
-                                          obs.config_get_int(config, "AdvOut", "RecSplitFileTime") * 60000)
-                        case "Size":
-                            obs.timer_add(split_file_auto_callback, 1000)   # Worth being user-configurable?
-                            split_file.size = obs.config_get_int(config, "AdvOut", "RecSplitFileSize") * 1000000
+                    split_type = obs.config_get_string(config, "AdvOut", "RecSplitFileType")
+                    if native_auto_split and split_type in ("Time", "Size"):
+                        # Leave the split to OBS, the next filename is set once the recording
+                        # has started and after each split
+                        split_file.prerender = True
+
+                    else:
+                        # If one of the non-manual filesplitting types was selected, change to manual
+                        # and divert the check for filesplitting to our own function
+                        split_file.hotkey.activate(True)
+                        split_file.old_mode = split_type
+                        obs.config_set_string(config, "AdvOut", "RecSplitFileType", "Manual")
+
+                        match split_file.old_mode:
+                            case "Time":
+                                obs.timer_add(split_file_auto_callback,
+                                              obs.config_get_int(config, "AdvOut", "RecSplitFileTime") * 60000)
+                            case "Size":
+                                obs.timer_add(split_file_auto_callback, 1000)   # Worth being user-configurable?
+                                split_file.size = obs.config_get_int(config, "AdvOut", "RecSplitFileSize") * 1000000
 
 
         case obs.OBS_FRONTEND_EVENT_RECORDING_STARTED:
             if flags.record_enabled:
                 if split_file.old_mode == "Size":
                     split_file.current_file = obs_frontend_get_last_recording()
+                elif split_file.prerender:
+                    split_file_prerender()
 
             config = obs.obs_frontend_get_profile_config()
             obs.config_set_string(config, "Output",
@@ -861,6 +3177,14 @@ def rec_parser_apply_cb(event):
 
 
         case obs.OBS_FRONTEND_EVENT_RECORDING_STOPPED:
+            rec = obs.obs_frontend_get_recording_output()
+            obs.signal_handler_disconnect(obs.obs_output_get_signal_handler(rec),
+                                          "file_changed", split_file_done_callback)
+            obs.obs_output_release(rec)
+
+            if split_file.prerender:
+                split_file_rollback()
+
             if split_file.old_mode:
                 obs.timer_remove(split_file_auto_callback)
                 split_file.hotkey.activate(False)
@@ -874,24 +3198,23 @@ def rec_parser_apply_cb(event):
 
 
 ############################# Replay buffer parser
-buf_parser = Parser()
+buf_parser = Parser("Replay buffer", "replay buffer")
 
 
-def buf_parser_interpret():
+@timed("replay buffer")
+def buf_parser_interpret(grouped=False):
     """ Fetches data and returns interpreted string
+        With grouped, the data is fetched along the other profiles of the replay buffer group, see profile_filename
     """
-    data = parser_fetch_data(buf_parser.sources)
-    file_format = interpreter(buf_parser.tree, data, increase_counters=True, sanitize=(platform.system()=="Windows"))
-    return file_format[:valid_formatted_length(file_format)]
+    if grouped:
+        return profile_filename(buf_parser)
+    return parsers_interpret([buf_parser])[0][0]
 
 
 def buf_parser_tree_from_string(string):
     """ Creates parsed tree from string
     """
-    try:
-        buf_parser.tree = grammar.parse_string(string, True)
-    except pp.exceptions.ParseException:
-        buf_parser.tree = None
+    parser_tree_from_string(buf_parser, string)
 
 
 def buf_parser_connect_cb(event):
@@ -918,13 +3241,240 @@ def buf_parser_apply_cb(calldata):
         rb = obs.obs_frontend_get_replay_buffer_output()
 
         data = obs.obs_output_get_settings(rb)
-        obs.obs_data_set_string(data, 'format', buf_parser_interpret())
+        obs.obs_data_set_string(data, 'format', buf_parser_interpret(grouped=True))
         obs.obs_data_release(data)
 
         obs.obs_output_release(rb)
 
 
 
+###################################################################################################
+###### Formatter profiles #########################################################################
+###################################################################################################
+
+# Any output found by name can be named by a profile of formatter_profiles. The profiles of a group
+# share the data fetched when the first of their outputs fires, each being rendered on its own output.
+
+class Profile(Parser):
+    """ Additional formatter profile, setting the name of an output when it emits its signal
+    """
+    def __init__(self, name, group, output, signal):
+        super().__init__(name, group)
+        self.output         = output
+        self.signal         = signal
+        self.weak_output    = None
+        self.callback       = lambda calldata: profile_apply_cb(self)
+
+
+class Profiles():
+    """ Registry of the formatter profiles by name, and data fetched for each group
+    """
+    entries     = {}
+    snapshots   = {}                # Group -> (fetch time, {profile name: (sources, deps, data)})
+    lock        = threading.Lock()
+    snapshot_window = 2.0           # Seconds the data fetched for a group stays usable by its other outputs
+
+profiles = Profiles()
+profiles.entries.update({rec_parser.name: rec_parser, buf_parser.name: buf_parser})
+
+
+def load_profiles():
+    """ Creates the additional profiles from formatter_profiles
+    """
+    for name, settings in formatter_profiles.items():
+        if name in profiles.entries:
+            print(f"Formatter profile {name} ignored, the name is already used")
+            continue
+        profile = Profile(name, settings.get("group"), settings["output"], settings.get("signal", "starting"))
+        parser_tree_from_string(profile, settings["format"])
+        if profile.tree is None:
+            print(f"Formatter profile {name} : parsing error, malformed formatting string")
+        profile.sources = list(settings.get("sources", []))
+        profiles.entries[name] = profile
+
+
+def profile_sources():
+    """ Names of the sources listed by all the profiles
+    """
+    return {name for profile in profiles.entries.values() for name in profile.sources}
+
+
+def rename_listed_source(prev_name, new_name):
+    """ Follows the rename of a source in the sources lists of the profiles and of the script's settings
+    """
+    for profile in profiles.entries.values():
+        with profile.lock:
+            if prev_name in profile.sources:
+                profile.sources = [new_name if name == prev_name else name for name in profile.sources]
+                if profile.output is not None:
+                    print(f"Source {prev_name} renamed to {new_name}, update formatter_profiles for {profile.name}")
+
+    if settings_holder.settings is None:
+        return
+    for setting in ("rec_source", "buf_source"):
+        array = obs.obs_data_get_array(settings_holder.settings, setting)
+        for ind in range(obs.obs_data_array_count(array)):
+            item = obs.obs_data_array_item(array, ind)
+            if obs.obs_data_get_string(item, "value") == prev_name:
+                obs.obs_data_set_string(item, "value", new_name)
+                settings_holder.stale = True
+            obs.obs_data_release(item)
+        obs.obs_data_array_release(array)
+
+
+class PendingRenames():
+    """ Renames of listed sources, seen in the signal thread and applied by the renames timer
+    """
+    entries = []
+    lock    = threading.Lock()
+
+pending_renames = PendingRenames()
+
+
+def queue_source_rename(prev_name, new_name):
+    with pending_renames.lock:
+        pending_renames.entries.append((prev_name, new_name))
+    obs.timer_remove(pending_renames_timer_cb)
+    obs.timer_add(pending_renames_timer_cb, 1)
+
+
+def pending_renames_timer_cb():
+    """ Applies the queued renames along the other script callbacks, rather than while they use the settings
+    """
+    obs.timer_remove(pending_renames_timer_cb)
+    with pending_renames.lock:
+        renames, pending_renames.entries = pending_renames.entries, []
+    for prev_name, new_name in renames:
+        rename_listed_source(prev_name, new_name)
+
+
+def profile_output(profile):
+    """ Returns a strong reference to the profile's output, or None if it doesn't exist anymore
+    """
+    return obs.obs_weak_output_get_output(profile.weak_output) if profile.weak_output else None
+
+
+def profile_connect(profile):
+    """ Connects the profile to its output, again if the output was recreated since
+    """
+    output = profile_output(profile)
+    if output:
+        obs.obs_output_release(output)
+        return
+    profile_disconnect(profile)
+
+    output = obs.obs_get_output_by_name(profile.output)
+    if output:
+        profile.weak_output = obs.obs_output_get_weak_output(output)
+        obs.signal_handler_connect(obs.obs_output_get_signal_handler(output), profile.signal, profile.callback)
+        obs.obs_output_release(output)
+
+
+def profile_disconnect(profile):
+    if profile.weak_output is None:
+        return
+    output = profile_output(profile)
+    if output:
+        obs.signal_handler_disconnect(obs.obs_output_get_signal_handler(output), profile.signal, profile.callback)
+        obs.obs_output_release(output)
+    obs.obs_weak_output_release(profile.weak_output)
+    profile.weak_output = None
+
+
+def profile_members(group):
+    """ Profiles of the group that can currently be used
+    """
+    members = []
+    for profile in profiles.entries.values():
+        if profile.group != group or profile.template is None:
+            continue
+        if ((profile is rec_parser and not flags.record_enabled)
+            or (profile is buf_parser and not flags.buffer_enabled)):
+            continue
+        if profile.output is not None:
+            profile_connect(profile)
+            output = profile_output(profile)
+            if not output:
+                continue
+            obs.obs_output_release(output)
+        members.append(profile)
+    return members
+
+
+def profile_filename(profile):
+    """ Returns the name of the profile's output, rendered from the data last fetched for its group if it's recent
+        enough and was fetched for the same sources and formatting, otherwise fetching the data of the whole group
+    """
+    if profile.group is None:
+        return parsers_interpret([profile])[0][0]
+
+    apply_pending_formats()
+    with profile.lock:
+        sources, deps = profile.sources, profile.deps
+    with profiles.lock:
+        fetched, snapshots = profiles.snapshots.get(profile.group, (0, {}))
+        snapshot = snapshots.pop(profile.name, None)
+    if (snapshot and time.monotonic() - fetched < profiles.snapshot_window
+        and snapshot[0] == sources and snapshot[1] is deps):
+        return parsers_interpret([profile], [snapshot[2]])[0][0]
+
+    members = [profile] + [member for member in profile_members(profile.group) if member is not profile]
+    renders = []
+    for member in members:
+        with member.lock:
+            renders.append((member.sources, member.template, member.deps))
+    datas = parsers_fetch(renders)
+    with profiles.lock:
+        profiles.snapshots[profile.group] = (time.monotonic(),
+                                             {member.name: (sources, deps, data) for member, (sources, _, deps), data
+                                              in zip(members[1:], renders[1:], datas[1:])})
+    return parsers_interpret([profile], datas[:1])[0][0]
+
+
+def profile_apply_cb(profile):
+    """ Sets the name of the profile's output, when it emits its signal
+        Outputs with a path get their file renamed, keeping its folder and extension, others get their format set
+    """
+    if profile.template is None:
+        return
+    output = profile_output(profile)
+    if not output:
+        return
+
+    filename = profile_filename(profile)
+    data = obs.obs_output_get_settings(output)
+    path = obs.obs_data_get_string(data, "path")
+    if path:
+        folder, extension = os.path.dirname(path) or recording_folder(), os.path.splitext(path)[1][1:]
+        obs.obs_data_set_string(data, "path", os.path.join(folder, os_generate_formatted_filename(extension, get_space(), filename)))
+    else:
+        obs.obs_data_set_string(data, "format", filename)
+    obs.obs_data_release(data)
+    obs.obs_output_release(output)
+
+
+def clear_profiles():
+    """ Disconnects the additional profiles and drops the data fetched for them
+    """
+    with profiles.lock:
+        profiles.snapshots.clear()
+
+    for profile in profiles.entries.values():
+        if profile.output is not None:
+            profile_disconnect(profile)
+
+
+def profiles_frontend_cb(event):
+    """ Connects the additional profiles once their outputs can exist
+    """
+    match event:
+        case obs.OBS_FRONTEND_EVENT_FINISHED_LOADING | obs.OBS_FRONTEND_EVENT_SCENE_COLLECTION_CHANGED:
+            for profile in profiles.entries.values():
+                if profile.output is not None:
+                    profile_connect(profile)
+
+
+
 ###################################################################################################
 ###### UI building ################################################################################
 ###################################################################################################
@@ -936,6 +3486,7 @@ class SettingsHolder():
         (here the counter value display with the refresh counters button.)
     """
     settings = None
+    stale    = False                    # Settings changed by the script since the properties were last refreshed
 
 settings_holder = SettingsHolder()
 
@@ -964,68 +3515,241 @@ def get_space():
     # Because consistency is overrated I guess
 
 
-def rec_tester(props, *args):
-    """ Attempts to builds a filename from the specified recording formatting and displays it in the UI
+def recording_folder():
+    """ Folder recordings are saved to, in the current output mode
+    """
+    config = obs.obs_frontend_get_profile_config()
+    mode = obs.config_get_string(config, "Output",
+                                 "Mode")  or ""
+
+    if mode == "Simple":
+        return obs.config_get_string(config, "SimpleOutput", "FilePath") or ""
+    rectype = obs.config_get_string(config, "AdvOut",
+                                    "RecType") or ""
+    if rectype == "Standard":
+        return obs.config_get_string(config, "AdvOut", "RecFilePath") or ""
+    return obs.config_get_string(config, "AdvOut", "FFFilePath") or ""
+
+
+def render_display(template, sources, deps):
+    """ Renders a template without increasing the counters, returns the filename and the number of errors
+    """
+    data = parser_fetch_data(sources, deps)
+    error_counter = ErrCounter()
+    result = os_generate_formatted_filename("", get_space(), render_template(template, data, error_counter, increase_counters=False, sanitize=True))
+    return result, error_counter.counter
+
+
+def show_render(props, prefix, template, sources, deps):
+    """ Renders a template without increasing the counters and displays the filename in the UI,
+        a None template standing for a malformed formatting
+    """
+    if template is None:
+        show_rendered(props, prefix, None)
+        return
+    try:
+        with RenderBudget(render_deadline):
+            rendered = render_display(template, sources, deps)
+    except RenderTimeout as exc:
+        rendered = f"evaluating {str(exc)!r} took over {render_deadline}s, OBS's formatting would be used instead"
+    show_rendered(props, prefix, rendered)
+
+
+def show_rendered(props, prefix, rendered):
+    """ Displays in the UI what render_display returned, None standing for a malformed formatting,
+        and a message for a render that didn't happen
     """
-    obs.obs_property_set_long_description(  obs.obs_properties_get(props, "rec_warning"), " ")
-    obs.obs_property_set_description(       obs.obs_properties_get(props, "rec_warning"), " ")
-    obs.obs_property_set_long_description(  obs.obs_properties_get(props, "rec_result"),  " ")
-    obs.obs_property_set_description(       obs.obs_properties_get(props, "rec_result"),  " ")
+    obs.obs_property_set_long_description(  obs.obs_properties_get(props, f"{prefix}_warning"), " ")
+    obs.obs_property_set_description(       obs.obs_properties_get(props, f"{prefix}_warning"), " ")
+    obs.obs_property_set_long_description(  obs.obs_properties_get(props, f"{prefix}_result"),  " ")
+    obs.obs_property_set_description(       obs.obs_properties_get(props, f"{prefix}_result"),  " ")
 
-    if rec_parser.tree is None:
-        obs.obs_property_set_long_description(  obs.obs_properties_get(props, "rec_warning"), "parsing error, malformed formatting string")
-        obs.obs_property_set_description(       obs.obs_properties_get(props, "rec_warning"), "Error: ")
-        obs.obs_property_text_set_info_type(    obs.obs_properties_get(props, "rec_warning"), obs.OBS_TEXT_INFO_ERROR)
+    if rendered is None:
+        obs.obs_property_set_long_description(  obs.obs_properties_get(props, f"{prefix}_warning"), "parsing error, malformed formatting string")
+        obs.obs_property_set_description(       obs.obs_properties_get(props, f"{prefix}_warning"), "Error: ")
+        obs.obs_property_text_set_info_type(    obs.obs_properties_get(props, f"{prefix}_warning"), obs.OBS_TEXT_INFO_ERROR)
+
+    elif isinstance(rendered, str):
+        obs.obs_property_set_long_description(  obs.obs_properties_get(props, f"{prefix}_warning"), rendered)
+        obs.obs_property_set_description(       obs.obs_properties_get(props, f"{prefix}_warning"), "Warning: ")
+        obs.obs_property_text_set_info_type(    obs.obs_properties_get(props, f"{prefix}_warning"), obs.OBS_TEXT_INFO_WARNING)
 
     else:
-        data = parser_fetch_data(rec_parser.sources)
-        error_counter = ErrCounter()
-        result = os_generate_formatted_filename("", get_space(), interpreter(rec_parser.tree, data, error_counter, increase_counters=False, sanitize=(platform.system()=="Windows")))
+        result, errors = rendered
+        obs.obs_property_set_long_description(  obs.obs_properties_get(props, f"{prefix}_result"), result)
+        obs.obs_property_set_description(       obs.obs_properties_get(props, f"{prefix}_result"), "")
+        obs.obs_property_text_set_info_type(    obs.obs_properties_get(props, f"{prefix}_result"), obs.OBS_TEXT_INFO_NORMAL)
+
+        if errors:
+            obs.obs_property_set_long_description(  obs.obs_properties_get(props, f"{prefix}_warning"), "errors while interpreting, check log for more details")
+            obs.obs_property_set_description(       obs.obs_properties_get(props, f"{prefix}_warning"), "Warning: ")
+            obs.obs_property_text_set_info_type(    obs.obs_properties_get(props, f"{prefix}_warning"), obs.OBS_TEXT_INFO_WARNING)
+
+
+def show_analysis(props, prefix, tree, sources):
+    """ Displays the static analysis of a parsed tree in the UI, nothing for a malformed formatting
+    """
+    analysis = obs.obs_properties_get(props, f"{prefix}_analysis")
+    if tree is None:
+        obs.obs_property_set_long_description(  analysis, " ")
+        obs.obs_property_set_description(       analysis, " ")
+        return
+    obs.obs_property_set_long_description(  analysis, "\n".join(report_lines(analyze_tree(tree), sources)))
+    obs.obs_property_set_description(       analysis, "Analysis: ")
+    obs.obs_property_text_set_info_type(    analysis, obs.OBS_TEXT_INFO_NORMAL)
 
-        obs.obs_property_set_long_description(  obs.obs_properties_get(props, "rec_result"), result)
-        obs.obs_property_set_description(       obs.obs_properties_get(props, "rec_result"), "")
-        obs.obs_property_text_set_info_type(    obs.obs_properties_get(props, "rec_result"), obs.OBS_TEXT_INFO_NORMAL)
 
-        if error_counter.counter:
-            obs.obs_property_set_long_description(  obs.obs_properties_get(props, "rec_warning"), "errors while interpreting, check log for more details")
-            obs.obs_property_set_description(       obs.obs_properties_get(props, "rec_warning"), "Warning: ")
-            obs.obs_property_text_set_info_type(    obs.obs_properties_get(props, "rec_warning"), obs.OBS_TEXT_INFO_WARNING)
+def rec_tester(props, *args):
+    """ Attempts to builds a filename from the specified recording formatting and displays it in the UI
+    """
+    apply_pending_formats()
+    with rec_parser.lock:
+        tree, template, sources, deps = rec_parser.tree, rec_parser.template, rec_parser.sources, rec_parser.deps
+    show_render(props, "rec", template, sources, deps)
+    show_analysis(props, "rec", tree, sources)
 
     fill_counters_list(props)
-    obs.obs_data_set_int(settings_holder.settings, "counter_val", counters.data[counters.selected])
+    show_counter(settings_holder.settings)
     return True
 
 
 def buf_tester(props, *args):
     """ Attempts to builds a filename from the specified replay buffer formatting and displays it in the UI
     """
-    obs.obs_property_set_long_description(  obs.obs_properties_get(props, "buf_warning"), " ")
-    obs.obs_property_set_description(       obs.obs_properties_get(props, "buf_warning"), " ")
-    obs.obs_property_set_long_description(  obs.obs_properties_get(props, "buf_result"),  " ")
-    obs.obs_property_set_description(       obs.obs_properties_get(props, "buf_result"),  " ")
+    apply_pending_formats()
+    with buf_parser.lock:
+        tree, template, sources, deps = buf_parser.tree, buf_parser.template, buf_parser.sources, buf_parser.deps
+    show_render(props, "buf", template, sources, deps)
+    show_analysis(props, "buf", tree, sources)
+
+    fill_counters_list(props)
+    show_counter(settings_holder.settings)
+    return True
+
+
+#### Live preview
+###################################################################################################
+
+# The modified callbacks of the formatting and sources fields run on every keystroke, on the UI thread.
+# A preview is rendered at most once per format_debounce, the last formatting typed by the formattings
+# timer. Exec and if tokens are shown as placeholders, user code only runs with "Check formatting".
+
+class Previews():
+    """ Live previews of the formattings being typed, by prefix
+    """
+    shown       = {}                # (formatting, sources) last rendered, with its tree and what show_rendered displays
+    displayed   = {}                # Preview the properties were last refreshed with
+    pending     = {}                # (formatting, sources) waiting for the timer
+    last        = {}                # Time of the last render
+    lock        = threading.Lock()
+
+previews = Previews()
+
+preview_placeholders = {"exec": "{exec}", "if": "{if}"}
+
+
+def preview_tree(tree):
+    """ Returns the tree with its exec and if tokens replaced by placeholders
+    """
+    nodes = []
+    for node in tree:
+        if node[0] in preview_placeholders:
+            nodes.append(("string", preview_placeholders[node[0]]))
+        elif node[0] == "string":
+            nodes.append(node)
+        else:
+            nodes.append((node[0], *(preview_tree(subtree) for subtree in node[1:])))
+    return nodes
 
-    if buf_parser.tree is None:
-        obs.obs_property_set_long_description(  obs.obs_properties_get(props, "buf_warning"), "parsing error, malformed formatting string")
-        obs.obs_property_set_description(       obs.obs_properties_get(props, "buf_warning"), "Error: ")
-        obs.obs_property_text_set_info_type(    obs.obs_properties_get(props, "buf_warning"), obs.OBS_TEXT_INFO_ERROR)
 
+def render_preview(prefix, key):
+    """ Parses and renders a (formatting, sources) for the preview of the prefix, and stores it as shown
+    """
+    string, sources = key
+    built = parsed_format(string, "native", persist=False)
+    if built is None:
+        tree, rendered = None, None
     else:
-        data = parser_fetch_data(buf_parser.sources)
-        error_counter = ErrCounter()
-        result = os_generate_formatted_filename("", get_space(), interpreter(buf_parser.tree, data, error_counter, increase_counters=False, sanitize=(platform.system()=="Windows")))
+        tree = built[0]
+        shown = preview_tree(tree)
+        rendered = render_display(compile_tree(shown), list(sources), tree_dependencies(shown))
 
-        obs.obs_property_set_long_description(  obs.obs_properties_get(props, "buf_result"), result)
-        obs.obs_property_set_description(       obs.obs_properties_get(props, "buf_result"), "")
-        obs.obs_property_text_set_info_type(    obs.obs_properties_get(props, "buf_result"), obs.OBS_TEXT_INFO_NORMAL)
+    with previews.lock:
+        previews.shown[prefix] = (key, tree, rendered)
+        previews.last[prefix] = time.monotonic()
 
-        if error_counter.counter:
-            obs.obs_property_set_long_description(  obs.obs_properties_get(props, "buf_warning"), "errors while interpreting, check log for more details")
-            obs.obs_property_set_description(       obs.obs_properties_get(props, "buf_warning"), "Warning: ")
-            obs.obs_property_text_set_info_type(    obs.obs_properties_get(props, "buf_warning"), obs.OBS_TEXT_INFO_WARNING)
 
-    fill_counters_list(props)
-    obs.obs_data_set_int(settings_holder.settings, "counter_val", counters.data[counters.selected])
-    return True
+def render_pending_previews():
+    """ Renders the previews still waiting for the timer
+    """
+    with previews.lock:
+        pending = list(previews.pending.items())
+        previews.pending.clear()
+    for prefix, key in pending:
+        render_preview(prefix, key)
+
+
+def preview_format(props, settings, prefix):
+    """ Displays the filename the formatting being typed gives, without waiting for it to be parsed for good
+        Returns whether the preview displayed changed, for the properties to be refreshed
+    """
+    if not obs.obs_data_get_bool(settings, f"{prefix}_enable"):
+        return False
+    key = (obs.obs_data_get_string(settings, f"{prefix}_format"), tuple(settings_source_list(settings, f"{prefix}_source")))
+
+    with previews.lock:
+        shown = previews.shown.get(prefix)
+        waiting = (shown is not None and shown[0] != key
+                   and time.monotonic() - previews.last[prefix] < format_debounce)
+        if waiting:
+            previews.pending[prefix] = key
+        else:
+            previews.pending.pop(prefix, None)
+
+    if waiting:
+        obs.timer_remove(pending_formats_timer_cb)
+        obs.timer_add(pending_formats_timer_cb, int(format_debounce * 1000))
+    elif shown is None or shown[0] != key:
+        render_preview(prefix, key)
+
+    with previews.lock:
+        shown = previews.shown[prefix]
+        changed = previews.displayed.get(prefix) != shown
+        previews.displayed[prefix] = shown
+    (string, sources), tree, rendered = shown
+    show_rendered(props, prefix, rendered)
+    show_analysis(props, prefix, tree, list(sources))
+    return changed
+
+
+def take_stale_settings():
+    """ Returns whether the properties need refreshing to show settings the script changed, once
+    """
+    stale, settings_holder.stale = settings_holder.stale, False
+    return stale
+
+
+def rec_preview_modified(props, prop, settings):
+    stale = take_stale_settings()
+    return preview_format(props, settings, "rec") or stale
+
+
+def buf_preview_modified(props, prop, settings):
+    stale = take_stale_settings()
+    return (flags.buffer_available and preview_format(props, settings, "buf")) or stale
+
+
+def settings_source_list(settings, name):
+    """ Names of an editable list of sources of the settings
+    """
+    sources = []
+    array = obs.obs_data_get_array(settings, name)
+    for ind in range(obs.obs_data_array_count(array)):
+        item = obs.obs_data_array_item(array, ind)
+        sources.append(obs.obs_data_get_string(item, "value"))
+        obs.obs_data_release(item)
+    obs.obs_data_array_release(array)
+    return sources
 
 
 def fill_counters_list(props):
@@ -1033,21 +3757,32 @@ def fill_counters_list(props):
     """
     counter_list = obs.obs_properties_get(props, "counter_list")
     obs.obs_property_list_clear(counter_list)
-    for counter_name in counters.data:
+    with counters.lock:
+        counter_names = list(counters.data)
+    for counter_name in counter_names:
         obs.obs_property_list_add_string(counter_list, "Default Counter" if (counter_name=="counter") else f"Counter : {counter_name}", f"{counter_name}")
 
 
 def refresh_counters(props, prop):
-    """ Checks the formatting and creates any new counter that was specified in it,
+    """ Checks the formattings and creates any new counter that was specified in them,
     and refreshes the value of the currently displayed counter.
+    Counters are found by analysing the formattings, without rendering them, so a counter whose name
+    is only known at render time is only created by its first render.
     """
-    data = parser_fetch_data(rec_parser.sources)
-    interpreter(rec_parser.tree, data, increase_counters=False)
-    data = parser_fetch_data(buf_parser.sources)
-    interpreter(buf_parser.tree, data, increase_counters=False)
+    apply_pending_formats()
+    for profile in list(profiles.entries.values()):
+        with profile.lock:
+            tree = profile.tree
+        if tree is None:
+            continue
+        for name in analyze_tree(tree).counters:
+            with counters.lock:
+                if name not in counters.data:
+                    set_counter(name, 0)
+    sync_counter_journal()
 
     fill_counters_list(props)
-    obs.obs_data_set_int(settings_holder.settings, "counter_val", counters.data[counters.selected])
+    show_counter(settings_holder.settings)
     return True
 
 
@@ -1055,7 +3790,8 @@ def remove_counter(props, prop):
     """ Deletes the currently selected ccounter from the existing one
     """
     if counters.selected and counters.selected != "counter":
-        counters.data.pop(counters.selected)
+        set_counter(counters.selected, None)
+        sync_counter_journal()
     else:
         print("Cannot remove default counter.")
 
@@ -1069,15 +3805,30 @@ def counter_selected_modified(props, prop, settings):
     selected_counter = obs.obs_data_get_string(settings, "counter_list")
     if selected_counter:
         counters.selected = selected_counter
-        obs.obs_data_set_int(settings, "counter_val", counters.data[counters.selected])
+        show_counter(settings)
         return True
 
 
 def counter_value_modified(props, prop, settings):
     """ Updates the value of a counter when it is modified through the UI
+        Only a value other than the one last shown was entered by the user, the shown one may be outdated
+        by a render since
     """
     if json.loads(obs.obs_data_get_json_with_defaults(settings)):
-        counters.data[counters.selected] = obs.obs_data_get_int(settings, "counter_val")
+        value = obs.obs_data_get_int(settings, "counter_val")
+        with counters.lock:
+            if value != counters.shown:
+                counters.shown = value
+                set_counter(counters.selected, value)
+        sync_counter_journal()
+
+
+def show_counter(settings):
+    """ Displays the current value of the selected counter
+    """
+    with counters.lock:
+        counters.shown = counters.data.get(counters.selected, 0)
+    obs.obs_data_set_int(settings, "counter_val", counters.shown)
 
 
 class PropertiesFlags():
@@ -1105,12 +3856,14 @@ def process_props_flags(props, *args):
         obs.obs_property_set_visible(obs.obs_properties_get(props, "rec_tester"),   True)
         obs.obs_property_set_visible(obs.obs_properties_get(props, "rec_result"),   True)
         obs.obs_property_set_visible(obs.obs_properties_get(props, "rec_warning"),  True)
+        obs.obs_property_set_visible(obs.obs_properties_get(props, "rec_analysis"), True)
     else:
         obs.obs_property_set_visible(obs.obs_properties_get(props, "rec_format"),   False)
         obs.obs_property_set_visible(obs.obs_properties_get(props, "rec_source"),   False)
         obs.obs_property_set_visible(obs.obs_properties_get(props, "rec_tester"),   False)
         obs.obs_property_set_visible(obs.obs_properties_get(props, "rec_result"),   False)
         obs.obs_property_set_visible(obs.obs_properties_get(props, "rec_warning"),  False)
+        obs.obs_property_set_visible(obs.obs_properties_get(props, "rec_analysis"), False)
 
     if flags.buffer_enabled:
         obs.obs_property_set_visible(obs.obs_properties_get(props, "buf_format"),   True)
@@ -1118,18 +3871,20 @@ def process_props_flags(props, *args):
         obs.obs_property_set_visible(obs.obs_properties_get(props, "buf_tester"),   True)
         obs.obs_property_set_visible(obs.obs_properties_get(props, "buf_result"),   True)
         obs.obs_property_set_visible(obs.obs_properties_get(props, "buf_warning"),  True)
+        obs.obs_property_set_visible(obs.obs_properties_get(props, "buf_analysis"), True)
     else:
         obs.obs_property_set_visible(obs.obs_properties_get(props, "buf_format"),   False)
         obs.obs_property_set_visible(obs.obs_properties_get(props, "buf_source"),   False)
         obs.obs_property_set_visible(obs.obs_properties_get(props, "buf_tester"),   False)
         obs.obs_property_set_visible(obs.obs_properties_get(props, "buf_result"),   False)
         obs.obs_property_set_visible(obs.obs_properties_get(props, "buf_warning"),  False)
+        obs.obs_property_set_visible(obs.obs_properties_get(props, "buf_analysis"), False)
 
     return True
 
 
 def script_defaults(settings):
-    if not (pp and obs_version_check):
+    if not obs_version_check:
         return
     config = obs.obs_frontend_get_profile_config()
     rec_parser.oldformat = obs.config_get_string(config, "Output",
@@ -1172,7 +3927,7 @@ def script_properties():
     blank = obs.obs_properties_add_text(props, "tblank",    "<p style='color:#00000000'>Formatting</p>",   obs.OBS_TEXT_INFO)
     obs.obs_property_set_long_description(blank, " ")
 
-    if not (pp and obs_version_check):
+    if not obs_version_check:
         return props
 
     obs.obs_properties_add_button(              props, "counter_refresh",   "Refresh counters list",    refresh_counters)
@@ -1189,6 +3944,7 @@ def script_properties():
     obs.obs_properties_add_button(          props, "rec_tester",    "Check formatting", rec_tester)
     obs.obs_properties_add_text(            props, "rec_result",    " ",                obs.OBS_TEXT_INFO)
     obs.obs_properties_add_text(            props, "rec_warning",   " ",                obs.OBS_TEXT_INFO)
+    obs.obs_properties_add_text(            props, "rec_analysis",  " ",                obs.OBS_TEXT_INFO)
 
     obs.obs_properties_add_bool(            props, "buf_enable",    "Enable replay buffer formatting")
     obs.obs_properties_add_editable_list(   props, "buf_source",    "Sources",          obs.OBS_EDITABLE_LIST_TYPE_STRINGS, None, None)
@@ -1196,10 +3952,17 @@ def script_properties():
     obs.obs_properties_add_button(          props, "buf_tester",    "Check formatting", buf_tester)
     obs.obs_properties_add_text(            props, "buf_result",    " ",                obs.OBS_TEXT_INFO)
     obs.obs_properties_add_text(            props, "buf_warning",   " ",                obs.OBS_TEXT_INFO)
+    obs.obs_properties_add_text(            props, "buf_analysis",  " ",                obs.OBS_TEXT_INFO)
 
     obs.obs_property_set_modified_callback(obs.obs_properties_get(props, "rec_enable"), process_props_flags)
     obs.obs_property_set_modified_callback(obs.obs_properties_get(props, "buf_enable"), process_props_flags)
+    for prefix, callback in (("rec", rec_preview_modified), ("buf", buf_preview_modified)):
+        obs.obs_property_set_modified_callback(obs.obs_properties_get(props, f"{prefix}_format"), callback)
+        obs.obs_property_set_modified_callback(obs.obs_properties_get(props, f"{prefix}_source"), callback)
     process_props_flags(props)
+
+    if timings_enabled:
+        obs.obs_properties_add_button(      props, "dump_timings",  "Dump timings",     dump_timings)
     return props
 
 
@@ -1210,12 +3973,17 @@ def script_description():
             "Allows dynamically generating filenames from sources state and more.<br>"
             "Please read <a href='https://github.com/Penwy/adv-ff/blob/main/docs/doc.md'>the docs</a>."
             )
-    if not pp:
+    if pyparsing_status == "failed":
         desc += ("<br>"
                  "<br>"
-                 "<font color=#ff0000>This script requires the <a href='https://pypi.org/project/pyparsing/'>PyParsing</a> module to properly function, but it wasn't found and failed to install.</font><br>"
+                 "<font color=#ff0000>The pyparsing parser requires the <a href='https://pypi.org/project/pyparsing/'>PyParsing</a> module, but it wasn't found and failed to install. The native parser is used instead.</font><br>"
                  "<font color=#ff0000>Check <a href='https://github.com/Penwy/adv-ff/tree/main/pyparsing-troubleshoot'>this page</a> for possible solutions.</font><br>"
                  )
+    if counter_journal.failure is not None:
+        desc += ("<br>"
+                 "<br>"
+                 f"<font color=#ff0000>The counter journal can't be written ({html.escape(counter_journal.failure)}), counters are only saved along the script's settings.</font><br>"
+                 )
     if not obs_version_check:
         desc += ("<br>"
                  "<br>"
@@ -1231,8 +3999,13 @@ def script_description():
 
 
 def script_load(settings):
-    if not (pp and obs_version_check):
+    startup.mark("script")
+    print(f"adv-ff loaded : {startup.report()}")
+    if not obs_version_check:
         return
+    if template_cache.entries is None:
+        load_template_cache()
+    AdvssResolver.unavailable = False
     settings_holder.settings = settings
     data = json.loads(obs.obs_data_get_json_with_defaults(settings))
 
@@ -1242,9 +4015,24 @@ def script_load(settings):
     obs.obs_frontend_add_event_callback(rec_parser_apply_cb)
     if flags.buffer_available:
         obs.obs_frontend_add_event_callback(buf_parser_connect_cb)
+    obs.obs_frontend_add_event_callback(snapshot_frontend_cb)
+    obs.obs_frontend_add_event_callback(profiles_frontend_cb)
+
+    handler = obs.obs_get_signal_handler()
+    for signal, callback in global_source_signals.items():
+        obs.signal_handler_connect(handler, signal, callback)
+
+    load_profiles()
+    for profile in profiles.entries.values():
+        if profile.output is not None:
+            profile_connect(profile)
+    source_snapshots.sync(profile_sources())
 
     counters.data.update(data["counters"])
+    replay_counter_journal()
+    compact_counter_journal()
     counters.selected = data["counter_list"]
+    show_counter(settings)
 
     @obs_hotkey_enum_func
     def get_split_hotkey(dat, hotkey_id, hotkey):
@@ -1258,6 +4046,21 @@ def script_load(settings):
 
 
 def script_unload():
+    print(f"Expression cache : {expression_cache.stats()}")
+    obs.obs_frontend_remove_event_callback(profiles_frontend_cb)
+    obs.timer_remove(pending_formats_timer_cb)
+    obs.timer_remove(pending_renames_timer_cb)
+    clear_profiles()
+    sync_counter_journal()
+    if counter_journal.file is not None:
+        counter_journal.file.close()
+        counter_journal.file = None
+    close_snapshot_capture()
+    obs.obs_frontend_remove_event_callback(snapshot_frontend_cb)
+    handler = obs.obs_get_signal_handler()
+    for signal, callback in global_source_signals.items():
+        obs.signal_handler_disconnect(handler, signal, callback)
+    source_snapshots.clear()
     if split_file.old_mode:
         obs.timer_remove(split_file_auto_callback)
         split_file.hotkey.activate(False)
@@ -1269,28 +4072,34 @@ def script_unload():
 
 
 def script_update(settings):
-    if not (pp and obs_version_check):
+    """ Called on every change of the settings, only applies what changed since the last call
+    """
+    if not obs_version_check:
         return
-    data = json.loads(obs.obs_data_get_json_with_defaults(settings))
+    flags.record_enabled =  obs.obs_data_get_bool(settings, "rec_enable")
+    flags.buffer_enabled =  obs.obs_data_get_bool(settings, "buf_enable") if flags.buffer_available else False
 
-    flags.record_enabled =  data["rec_enable"]
-    flags.buffer_enabled =  data["buf_enable"] if flags.buffer_available else False
+    sources_changed = False
+    for parser, prefix in ((rec_parser, "rec"), (buf_parser, "buf")):
+        update_format(parser, obs.obs_data_get_string(settings, f"{prefix}_format"))
+        sources = settings_source_list(settings, f"{prefix}_source")
+        if sources != parser.sources:
+            with parser.lock:
+                parser.sources = sources
+            sources_changed = True
 
-    rec_parser_tree_from_string(data["rec_format"])
-    rec_parser.sources = []
-    for item in (data["rec_source"]):
-        rec_parser.sources.append(item["value"])
-
-    buf_parser_tree_from_string(data["buf_format"])
-    buf_parser.sources = []
-    for item in (data["buf_source"]):
-        buf_parser.sources.append(item["value"])
+    if sources_changed:
+        source_snapshots.sync(profile_sources())
 
 
 
 def script_save(settings):
-    if not (pp and obs_version_check):
+    if not obs_version_check:
         return
-    counters_data = obs.obs_data_create_from_json(json.dumps(counters.data))
+    save_template_cache((obs.obs_data_get_string(settings, "rec_format"), obs.obs_data_get_string(settings, "buf_format"),
+                         *(profile["format"] for profile in formatter_profiles.values())))
+    with counters.lock:
+        counters_data = obs.obs_data_create_from_json(json.dumps(counters.data))
     obs.obs_data_set_obj(settings, "counters", counters_data)
     obs.obs_data_release(counters_data)
+    compact_counter_journal()
@@ -0,0 +1,254 @@
+"""
+Benchmarks of adv-ff's filename generation, run outside of OBS with the fake obspython and libobs.
+
+    python benchmarks/bench.py                  compares against benchmarks/baseline.json
+    python benchmarks/bench.py --save           stores the results as the new baseline
+    python benchmarks/bench.py -k parse         only runs the benchmarks whose name contains "parse"
+
+OBS calls counts the calls into the fake OBS API, formatted filenames and obs_data item lookups included,
+made by one more run of the benchmark.
+The interpreter.* and valid_length.linear.* benchmarks run the original implementations, from interpreter.py and
+linear_length.py, next to the current ones.
+Exits with status 1 if any benchmark got slower than the baseline by more than the threshold, or makes more OBS calls.
+Times are compared to the median ratio of the run rather than to the baseline alone, so that a machine busier or
+slower than when the baseline was recorded doesn't make every benchmark a regression.
+"""
+
+import argparse
+import contextlib
+import importlib.util
+import json
+import os.path
+import platform
+import statistics
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+import obspython as obs
+import libobs
+import interpreter
+import linear_length
+
+
+baseline_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+nesting = 24                # Depth of the nested templates
+truncated = "v$[key_0]$ %CCYY-%MM-%DD " * 24        # Longer than a filename may be once rendered
+
+templates = {
+    "obs":          "%CCYY-%MM-%DD %hh-%mm-%ss",
+    "typical":      "v$executable$ - v$title$ - v$scene$ c$counter$ %CCYY-%MM-%DD %hh-%mm-%ss",
+    "sources":      ("v$[key_3]$ v$1[key_5]$ v$2[nested][list][1][value]$ v$Source 3[number]$ "
+                     "v$[playlist][0][value]$ v$1[width]$x v$1[height]$ v$2[muted]$ v$1[class]$ %hh-%mm"),
+    "expressions":  ("$if$ 'v$executable$' == 'game.exe' $then$ c$v$[title]$$ $else$ other $end$ "
+                     "$exec$ 'v$[key_1]$'.upper()[:8] $end$ $exec$ round(v$1[ratio]$ * 100, 2) $end$ "
+                     "$if$ v$[enabled]$ or v$1[enabled]$ $then$ on $end$ %CCYY"),
+    "advss":        "a$variable_0$ a$variable_1$ a$variable_v$[number]$$ a$missing$ %CCYY-%MM-%DD",
+    "long":         " ".join(f"v$[key_{ind}]$ %hh-%mm-%ss" for ind in range(12)),
+    "nested_if":    ("".join(f"$if$ v$[number]$ < {nesting - ind} $then$ {ind}-" for ind in range(nesting))
+                     + "v$[key_0]$" + " $end$" * nesting),
+    "nested_exec":  "$exec$ " * nesting + "v$[number]$" + " + 1 $end$" * nesting,
+    "if_chain":     ("".join(f"$if$ 'v$[key_{ind % 8}]$' == 'x' or v$[number]$ + {nesting - 1 - ind} == 0 $then$ branch {ind} $else$ "
+                             for ind in range(nesting)) + "none" + " $end$" * nesting),
+    }
+
+
+def setup(script, args):
+    """ Builds the fake scene collection and loads it into the script
+    """
+    obs.populate(sources=args.sources, settings=args.settings, advss=args.advss, scenes=args.scenes)
+    sources = list(obs.frontend.sources)
+    script.rec_parser.sources = sources
+    script.buf_parser.sources = sources
+    script.source_snapshots.clear()
+    script.source_snapshots.sync(set(sources))
+    script.AdvssResolver.unavailable = False
+    return sources
+
+
+def invalidate(sources):
+    """ Signals a settings update on every source, as OBS does when they are modified
+    """
+    for name in sources:
+        obs.frontend.sources[name].signals.emit("update", source=obs.frontend.sources[name])
+
+
+def benchmarks(script, sources):
+    """ Yields (name, function) for every benchmark
+    """
+    for name, string in templates.items():
+        yield f"parse.native.{name}", lambda string=string: script.parse_format(string, "native")
+        if script.pp:
+            yield f"parse.pyparsing.{name}", lambda string=string: script.parse_format(string, "pyparsing")
+
+    for name, string in templates.items():
+        tree = script.parse_format(string, "native")
+        template = script.compile_tree(tree)
+        deps = script.tree_dependencies(tree)
+        data = script.parser_fetch_data(sources, deps)
+
+        yield f"fetch.full.{name}", lambda: script.parser_fetch_data(sources)
+        yield f"fetch.deps.{name}", lambda deps=deps: script.parser_fetch_data(sources, deps)
+
+        def fetch_invalidated(deps=deps):
+            invalidate(sources)
+            script.parser_fetch_data(sources, deps)
+        yield f"fetch.invalidated.{name}", fetch_invalidated
+
+        # Settings keys are only looked up in the obs_data when the render reads them, once per settings update
+        def fetch_lazy(template=template, deps=deps):
+            invalidate(sources)
+            script.render_template(template, script.parser_fetch_data(sources, deps), None, False)
+        yield f"fetch.lazy.{name}", fetch_lazy
+
+        yield (f"interpreter.{name}",
+               lambda tree=tree, data=data: interpreter.interpreter(script, tree, data, script.ErrCounter(), False))
+        yield (f"render.{name}",
+               lambda template=template, deps=deps: script.render_template(template,
+                                                                           script.parser_fetch_data(sources, deps),
+                                                                           None, False))
+
+        formatted = script.render_template(template, script.parser_fetch_data(sources, deps), None, False)
+
+        def valid_length_cold(formatted=formatted):
+            script.formatted_length_cache.lengths.clear()
+            script.valid_formatted_length(formatted)
+        yield f"valid_length.cold.{name}", valid_length_cold
+        yield f"valid_length.warm.{name}", lambda formatted=formatted: script.valid_formatted_length(formatted)
+        yield f"valid_length.linear.{name}", lambda formatted=formatted: linear_length.valid_formatted_length(script, formatted)
+
+    formatted = script.render_template(script.compile_tree(script.parse_format(truncated, "native")),
+                                       script.parser_fetch_data(sources), None, False)
+
+    def valid_length_truncated():
+        script.formatted_length_cache.lengths.clear()
+        script.valid_formatted_length(formatted)
+    yield "valid_length.cold.truncated", valid_length_truncated
+    yield "valid_length.warm.truncated", lambda: script.valid_formatted_length(formatted)
+    yield "valid_length.linear.truncated", lambda: linear_length.valid_formatted_length(script, formatted)
+
+    # Several outputs named for the same event, from the data fetched for their group or one fetch each
+    parsers = []
+    for ind, name in enumerate(("typical", "sources", "advss")):
+        parser = script.Parser(f"Profile {ind}", "benchmark")
+        script.parser_tree_from_string(parser, templates[name])
+        parser.sources = sources[ind:] + sources[:ind]
+        script.profiles.entries[parser.name] = parser
+        parsers.append(parser)
+
+    def profiles_shared():
+        invalidate(sources)
+        script.profiles.snapshots.clear()
+        for parser in parsers:
+            script.profile_filename(parser)
+    yield "profiles.shared", profiles_shared
+
+    def profiles_separate():
+        invalidate(sources)
+        for parser in parsers:
+            script.parsers_interpret([parser])
+    yield "profiles.separate", profiles_separate
+
+    # Measured as they get yielded, so each parser holds the right formatting while it runs
+    for name in ("typical", "expressions"):
+        script.rec_parser_tree_from_string(templates[name])
+        yield f"end_to_end.rec.{name}", script.rec_parser_interpret
+        script.buf_parser_tree_from_string(templates[name])
+        yield f"end_to_end.buf.{name}", script.buf_parser_interpret
+
+
+def measure(func, repeat):
+    """ Best time per call in seconds, over `repeat` runs of at least 0.1s
+    """
+    timer = timeit.Timer(func)
+    number, _ = timer.autorange()
+    return min(timer.repeat(repeat, number)) / number
+
+
+def format_time(seconds):
+    for unit, scale in (("s", 1), ("ms", 1e-3), ("us", 1e-6)):
+        if seconds >= scale:
+            return f"{seconds / scale:8.2f} {unit}"
+    return f"{seconds / 1e-9:8.2f} ns"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmarks adv-ff outside of OBS")
+    parser.add_argument("-k", dest="filter", default="", help="only run benchmarks whose name contains this")
+    parser.add_argument("--save", action="store_true", help="store the results as the new baseline")
+    parser.add_argument("--baseline", default=baseline_path, help="baseline file to compare against or save to")
+    parser.add_argument("--threshold", type=float, default=1.75, help="slowdown ratio, over the run's median, reported as a regression")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--sources", type=int, default=8, help="number of sources in the Sources list")
+    parser.add_argument("--settings", type=int, default=32, help="number of settings per source")
+    parser.add_argument("--advss", type=int, default=16, help="number of adv-ss variables")
+    parser.add_argument("--scenes", type=int, default=4, help="number of scenes")
+    args = parser.parse_args()
+
+    script = libobs.load_script()
+    if importlib.util.find_spec("pyparsing") is not None:
+        script.load_pyparsing()                 # Only loaded on demand by the script, needed for its benchmarks
+    sources = setup(script, args)
+    scale = {"sources": args.sources, "settings": args.settings, "advss": args.advss, "scenes": args.scenes}
+
+    baseline = None
+    if not args.save and os.path.exists(args.baseline):
+        with open(args.baseline, encoding="utf8") as file:
+            baseline = json.load(file)
+        if baseline["scale"] != scale:
+            print(f"Baseline was recorded at scale {baseline['scale']}, not comparing")
+            baseline = None
+
+    results = {}
+    calls = {}
+    ratios = {}
+    regressions = []
+    for name, func in benchmarks(script, sources):
+        if args.filter not in name:
+            continue
+        with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):   # The script's own logging
+            results[name] = measure(func, args.repeat)
+            before = obs.stats.calls + libobs.stats.formatted_filenames + libobs.stats.data_items
+            func()
+            calls[name] = obs.stats.calls + libobs.stats.formatted_filenames + libobs.stats.data_items - before
+
+        line = f"{name:<40} {format_time(results[name])} {calls[name]:5} OBS calls"
+        if baseline and name in baseline["results"]:
+            ratios[name] = results[name] / baseline["results"][name]
+            line += f"   x{ratios[name]:5.2f}"
+        if baseline and calls[name] > baseline.get("calls", {}).get(name, calls[name]):
+            line += f"   MORE OBS CALLS (was {baseline['calls'][name]})"
+            regressions.append(name)
+        print(line)
+
+    if ratios:
+        median = statistics.median(ratios.values())
+        slower = [name for name, ratio in ratios.items() if ratio > median * args.threshold]
+        print(f"\nMedian ratio to the baseline x{median:.2f}")
+        for name in slower:
+            print(f"REGRESSION {name:<40} x{ratios[name]:5.2f}, x{ratios[name] / median:.2f} over the median")
+        regressions += slower
+
+    # The bisection next to the linear search it replaced, on the same filenames
+    pairs = [(name, name.replace(".cold.", ".linear.")) for name in results
+             if name.startswith("valid_length.cold.") and name.replace(".cold.", ".linear.") in results]
+    if pairs:
+        print(f"\n{'valid_length':<32} {'bisection':>11} {'linear':>11} {'OBS calls':>10} {'linear':>7}")
+        for name, linear in pairs:
+            print(f"{name.removeprefix('valid_length.cold.'):<32} {format_time(results[name])} {format_time(results[linear])}"
+                  f" {calls[name]:10} {calls[linear]:7}")
+
+    if args.save:
+        with open(args.baseline, "w", encoding="utf8") as file:
+            json.dump({"python": platform.python_version(), "platform": platform.platform(),
+                       "scale": scale, "results": results, "calls": calls}, file, indent=4)
+            file.write("\n")
+        print(f"Baseline saved to {args.baseline}")
+
+    if regressions:
+        print(f"{len(regressions)} benchmark(s) slower than the baseline by more than x{args.threshold} over the median, or making more OBS calls")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
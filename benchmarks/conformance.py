@@ -0,0 +1,154 @@
+"""
+Conformance check of adv-ff's native parser against the pyparsing grammar, run outside of OBS with the fake obspython and libobs.
+
+Parses a fixed corpus of formattings, then randomly generated ones, with both parsers:
+    corpus      escapes, nested $if$ and $exec$ blocks, tabs, malformed formattings, other delimiters
+    fuzz        formattings assembled from the same pieces, valid or not, from a seeded generator
+
+    python benchmarks/conformance.py                        corpus and 2000 fuzzed formattings
+    python benchmarks/conformance.py --fuzz 20000 --seed 7  more formattings, from another seed
+
+Checks that both parsers give the same tree for every formatting, or both raise ParseError.
+Needs pyparsing. Exits with status 1 on any difference.
+"""
+
+import argparse
+import contextlib
+import os.path
+import random
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+import libobs
+
+
+corpus = [
+    "",
+    "plain text",
+    "v$title$",
+    "c$counter$ v$title$ %CCYY-%MM-%DD %hh-%mm-%ss",
+    "v$[a][b][1]$ v$0[text]$ v$Txt[text]$",
+    "a$foo$",
+    "v$v$0[text]$$",
+    "c$v$executable$$",
+    "v$[v$0[text]$]$",
+    "$exec$ 1+2 $end$",
+    "$exec$ len('v$title$') $end$",
+    "$if$ 1 $then$ yes $end$",
+    "$if$ 1 $then$ yes $else$ no $end$",
+    "$if$ 'v$executable$'=='javaw.exe' $then$ MC $else$ no $end$",
+    "$if$ 1 $then$ $if$ 0 $then$ a $else$ $exec$ 'b' $end$ $end$ $end$",
+    "$exec$ $if$ 1 $then$ 2 $else$ 3 $end$ $end$",
+    "$if$$then$$end$",
+    "$exec$$end$",
+    "$if$ 1 $then$ a $else$ b $else$ c $end$",
+    # Delimiters and letters standing for themselves
+    "vcav", "v", "c", "a", "cost $5", "v $title$", "price: 10$", "$", "$$", "$ $", "x$y",
+    "v$", "c$", "a$", "v$$", "vv$title$", "$title$", "$if", "if$", "$end", "$then$", "$else$", "$end$",
+    # Tabs, expanded the same way by both parsers
+    "\t", "a\tb", "v$\ttitle$", "\tv$title$\t", "$if$\t1\t$then$\tyes\t$end$", "12345678\tx\ty",
+    # Line breaks and other whitespace
+    "line\nbreak", "\r\n", "v$title\n$", "   ", "$exec$\n1\n$end$",
+    # Malformed
+    "$if$", "$if$ 1", "$if$ 1 $then$", "$if$ 1 $then$ a", "$if$ 1 $end$", "$exec$", "$exec$ 1",
+    "$then$ a $end$", "$else$", "$end$", "v$title", "c$counter", "v$[a]", "$exec$ $if$ 1 $end$",
+    "$if$ 1 $then$ $exec$ 2 $end$", "v$$if$$", "v$$exec$ 1 $end$$",
+    # Deep nesting
+    "$if$ 1 $then$ " * 12 + "x" + " $end$" * 12,
+    "$exec$ " * 12 + "1" + " $end$" * 12,
+    "v$" * 12 + "title" + "$" * 12,
+    "".join(f"$if$ {ind} $then$ {ind} $else$ " for ind in range(12)) + "x" + " $end$" * 12,
+]
+
+delimited_corpus = {
+    "%%": ["%%if%% 1 %%then%% v%%title%% %%else%% c%%counter%% %%end%%", "%% 100%", "v%%%title%%", "%CCYY %%exec%% 1 %%end%%"],
+    "#":  ["#if# 1 #then# v#title# #end#", "##", "v#title", "#exec# '#' #end#", "#", "#end#"],
+}
+
+pieces = ["$", "$if$", "$then$", "$else$", "$end$", "$exec$", "v$", "c$", "a$", "v", "c", "a",
+          " ", "\t", "\n", "x", "title", "[a]", "1", "'s'", "%CCYY", "$$", "if", "end"]
+
+
+def generate(rng, depth):
+    """ Returns a random formatting, well formed blocks mixed with loose pieces
+    """
+    out = []
+    for _ in range(rng.randint(0, 4)):
+        roll = rng.random()
+        if depth and roll < 0.2:
+            out.append(f"$if$ {generate(rng, depth - 1)} $then$ {generate(rng, depth - 1)}"
+                       + (f" $else$ {generate(rng, depth - 1)}" if rng.random() < 0.5 else "") + " $end$")
+        elif depth and roll < 0.3:
+            out.append(f"$exec$ {generate(rng, depth - 1)} $end$")
+        elif depth and roll < 0.45:
+            out.append(f"{rng.choice('vca')}${generate(rng, depth - 1)}$")
+        else:
+            out.append(rng.choice(pieces))
+    return "".join(out)
+
+
+def outcome(script, string, engine):
+    """ Returns the tree the engine gives, or the ParseError it raises
+    """
+    try:
+        if engine == "native":
+            return script.NativeParser(string, script.token_delimiter).parse()   # Without the fallback on pyparsing
+        return script.parse_format(string, engine)
+    except script.ParseError:
+        return script.ParseError
+
+
+def check(script, strings):
+    """ Returns the description of every formatting the parsers disagree on
+    """
+    errors = []
+    for string in strings:
+        try:
+            native = outcome(script, string, "native")
+        except Exception as exc:
+            native = exc
+        reference = outcome(script, string, "pyparsing")
+        if native != reference:
+            errors.append(f"{string!r} ({script.token_delimiter}) :\n        native    : {native!r}\n        pyparsing : {reference!r}")
+    return errors
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Conformance check of adv-ff's native parser against pyparsing")
+    parser.add_argument("--fuzz", type=int, default=2000, help="random formattings checked after the corpus")
+    parser.add_argument("--seed", type=int, default=0, help="seed of the random formattings")
+    parser.add_argument("--depth", type=int, default=4, help="nesting depth of the random formattings")
+    args = parser.parse_args()
+
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        script = libobs.load_script()
+        script.load_pyparsing()
+    if not script.pp:
+        print("Pyparsing is needed for the conformance check")
+        sys.exit(1)
+
+    rng = random.Random(args.seed)
+    checks = {"corpus": [("$", corpus)],
+              "delimiters": list(delimited_corpus.items()),
+              "fuzz": [("$", [generate(rng, args.depth) for _ in range(args.fuzz)])]}
+
+    failed = False
+    for name, runs in checks.items():
+        errors, count = [], 0
+        for delimiter, strings in runs:
+            script.token_delimiter = delimiter
+            script.pyparsing_grammar.cache_clear()
+            with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+                errors += check(script, strings)
+            count += len(strings)
+        print(f"{name:12} {count:6} formattings, {len(errors)} differences")
+        for error in errors:
+            print(f"    {error}")
+        failed = failed or bool(errors)
+
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
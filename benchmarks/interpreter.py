@@ -0,0 +1,105 @@
+"""
+The tree walking interpreter adv-ff used before templates got compiled, kept as the reference the compiled
+templates are benchmarked against. Copied from the original script, only taking the script module as first
+argument, and not failing on an $if$ without $else$.
+
+    import interpreter
+    interpreter.interpreter(script, tree, data, script.ErrCounter(), increase_counters=False)
+"""
+
+import re
+
+
+def interpreter(script, tree, data, err_counter, increase_counters=True, sanitize=False):
+    """ Builds an interpreted string from a parsed tree and data
+        Works recursively on the tree
+    """
+    return_string = ""
+    for node in tree:
+        match node[0]:
+
+            case "string":
+                return_string += node[1]
+
+            case "exec":
+                interpreted = interpreter(script, node[1], data, err_counter, increase_counters)
+                val, code = script.exec_eval(interpreted)
+                match code:
+                    case 200:
+                        return_string += str(val)
+                    case 400:
+                        err_counter.counter +=1
+                        print(f"Malformed exec : {interpreted} : {val}")
+                    case 405:
+                        err_counter.counter +=1
+                        print(f"Forbidden exec token : {interpreted} : {val}")
+                    case 422:
+                        err_counter.counter +=1
+                        print(f"Failed exec : {interpreted} : {val}")
+
+            case "if":
+                interpreted = interpreter(script, node[1], data, err_counter, increase_counters)
+                condition, code = script.if_eval(interpreted)
+                match code:
+                    case 200:
+                        if condition:
+                            return_string += interpreter(script, node[2], data, err_counter)
+                        elif len(node) > 3:
+                            return_string += interpreter(script, node[3], data, err_counter)
+                    case 400:
+                        err_counter.counter +=1
+                        print(f"Malformed if : {interpreted} : {condition}")
+                    case 405:
+                        err_counter.counter +=1
+                        print(f"Forbidden if token : {interpreted} : {condition}")
+                    case 422:
+                        err_counter.counter +=1
+                        print(f"Failed if : {interpreted} : {condition}")
+
+            case "counter":
+                interpreted = interpreter(script, node[1], data, err_counter, increase_counters)
+                return_string += script.counter_eval(interpreted, increase_counters)
+
+            case "advss":
+                interpreted = interpreter(script, node[1], data, err_counter, increase_counters)
+                val, code = script.advss_fetch(interpreted)
+                match code:
+                    case 200:
+                        return_string += val
+                    case 404:
+                        err_counter.counter +=1
+                        print(f"Adv-ss variable not found : {interpreted}")
+                    case 501:
+                        err_counter.counter +=1
+                        print(f"Adv-ss not loaded")
+
+
+            case "value":
+                try:
+                    interpreted = interpreter(script, node[1], data, err_counter, increase_counters)
+                    inds = interpreted.split("][")
+                    startinds = inds[0].split("[")
+                    startinds[0] = "0" if startinds[0] == "" else startinds[0]
+                    inds = startinds + inds[1:]
+                    inds[-1] = inds[-1][:-1] if inds[-1][-1] == "]" else inds[-1]
+
+                    val = data
+                    for ind in inds:
+                        try:
+                            val = val[int(ind)]
+                        except ValueError:
+                            val = val[ind]
+
+                except KeyError as ex:
+                    err_counter.counter +=1
+                    print(f"Missing key : {ex} in {interpreted}")
+                    val = ""
+                return_string += str(val)
+
+    if sanitize:
+        return_string = re.sub(r"[\*\"<>:\|\?]", "_", return_string)
+
+    if script.remove_zws:
+        return_string = re.sub(r"[\u180e\u200B\u200C\u200D\u2060\ufeff]", "", return_string)
+
+    return return_string
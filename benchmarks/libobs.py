@@ -0,0 +1,188 @@
+"""
+Stand-in for the libobs and obs-frontend-api functions adv-ff loads with ctypes,
+and loader importing adv-ff.py with them in place of the real libraries.
+"""
+
+import atexit
+import os.path
+import shutil
+import sys
+import re
+import ctypes as ct
+import ctypes.util
+import importlib.util
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+import obspython as obs
+
+
+script_path = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "adv-ff.py")
+
+# Fixed values for the OBS formatting specifiers, of the same length as the real ones
+specifier_values = {"%CCYY": "2026", "%YY": "26", "%MM": "10", "%DD": "18", "%hh": "21", "%mm": "42", "%ss": "07",
+                    "%CRES": "1920x1080", "%ORES": "1280x720", "%FPS": "60", "%VF": "NV12", "%%": "%",
+                    "%a": "Sun", "%A": "Sunday", "%b": "Oct", "%B": "October", "%d": "18", "%H": "21", "%I": "09",
+                    "%m": "10", "%M": "42", "%p": "PM", "%s": "1792352527", "%S": "07", "%y": "26", "%Y": "2026",
+                    "%z": "+0200", "%Z": "CEST"}
+specifier_pattern = re.compile("|".join(re.escape(spec) for spec in sorted(specifier_values, key=len, reverse=True)))
+
+
+class Stats():
+    """ Counts the calls made into the fake libraries
+    """
+    formatted_filenames = 0
+    data_items          = 0             # obs_data items looked up, as LazySettings reads the settings
+
+stats = Stats()
+
+
+class Item():
+    """ obs_data_item, as a position in the dict of an obs.Data
+    """
+    def __init__(self, values, name):
+        self.values = values
+        self.name   = name
+
+    @property
+    def value(self):
+        return self.values[self.name]
+
+
+def pointer_value(pointer):
+    """ Integer value of a pointer given either as an int or a ctypes object
+    """
+    return pointer.value if isinstance(pointer, ct.c_void_p) else pointer
+
+
+def item(pointer):
+    return obs.handles[pointer_value(pointer)]
+
+
+class FakeLib():
+    """ Functions of libobs and obs-frontend-api used by adv-ff
+    """
+    def __init__(self):
+        self.buffers = {}
+        self.last_recording = b"/path/to/recordings/2026-10-18 21-42-07.mkv"
+        self.config_path = tempfile.mkdtemp(prefix="adv-ff-config-")   # Keeps the script's files out of the user's OBS config
+        atexit.register(shutil.rmtree, self.config_path, ignore_errors=True)
+
+        for kind, getter in (("string",  lambda pointer: item(pointer).value.encode("utf-8")),
+                             ("int",     lambda pointer: item(pointer).value),
+                             ("double",  lambda pointer: item(pointer).value),
+                             ("bool",    lambda pointer: item(pointer).value),
+                             ("obj",     lambda pointer: obs.handle(obs.Data(item(pointer).value))),
+                             ("array",   lambda pointer: obs.handle(list(item(pointer).value)))):
+            setattr(self, f"obs_data_item_get_{kind}", getter)
+            setattr(self, f"obs_data_item_get_default_{kind}", getter)
+
+        # ctypes sets restype and argtypes on the functions, which bound methods don't allow
+        for name in dir(type(self)):
+            if name.startswith(("obs_", "os_", "bfree")):
+                setattr(self, name, lambda *args, method=getattr(self, name): method(*args))
+
+    def allocate(self, value):
+        buffer = ct.create_string_buffer(value)
+        self.buffers[ct.addressof(buffer)] = buffer
+        return ct.addressof(buffer)
+
+    def bfree(self, pointer):
+        self.buffers.pop(pointer, None)
+
+    def os_generate_formatted_filename(self, extension, space, file_format):
+        stats.formatted_filenames += 1
+        filename = specifier_pattern.sub(lambda match: specifier_values[match.group()], file_format.decode("utf-8"))
+        if not space:
+            filename = filename.replace(" ", "_")
+        if extension:
+            filename = f"{filename}.{extension.decode('utf-8')}"
+        return self.allocate(filename.encode("utf-8"))
+
+    def os_get_config_path_ptr(self, name):
+        return self.allocate(os.path.join(self.config_path, name.decode("utf-8")).encode("utf-8"))
+
+    def obs_frontend_get_last_recording(self):
+        return self.allocate(self.last_recording)
+
+    def obs_hotkey_get_name(self, hotkey):
+        return b""
+
+    def obs_enum_hotkeys(self, callback, data):
+        pass
+
+    def obs_data_item_byname(self, data_p, name):
+        stats.data_items += 1
+        values = obs.handles[data_p].values
+        name = name.decode("utf-8")
+        return obs.handle(Item(values, name)) if name in values else None
+
+    def obs_data_first(self, data_p):
+        stats.data_items += 1
+        values = obs.handles[data_p].values
+        return obs.handle(Item(values, next(iter(values)))) if values else None
+
+    def obs_data_item_next(self, item_pp):
+        stats.data_items += 1
+        current = obs.handles.pop(item_pp._obj.value)
+        names = list(current.values)
+        ind = names.index(current.name) + 1
+        item_pp._obj.value = obs.handle(Item(current.values, names[ind])) if ind < len(names) else None
+        return bool(item_pp._obj.value)
+
+    def obs_data_item_release(self, item_pp):
+        obs.handles.pop(item_pp._obj.value, None)
+
+    def obs_data_item_get_name(self, item_p):
+        return item(item_p).name.encode("utf-8")
+
+    def obs_data_item_gettype(self, item_p):
+        value = item(item_p).value
+        if isinstance(value, str):
+            return obs.OBS_DATA_STRING
+        if isinstance(value, bool):
+            return obs.OBS_DATA_BOOLEAN
+        if isinstance(value, (int, float)):
+            return obs.OBS_DATA_NUMBER
+        if isinstance(value, dict):
+            return obs.OBS_DATA_OBJECT
+        if isinstance(value, list):
+            return obs.OBS_DATA_ARRAY
+        return obs.OBS_DATA_NULL
+
+    def obs_data_item_numtype(self, item_p):
+        return obs.OBS_DATA_NUM_INT if isinstance(item(item_p).value, int) else obs.OBS_DATA_NUM_DOUBLE
+
+    def obs_data_item_has_user_value(self, item_p):
+        return True
+
+    def obs_data_addref(self, data_p):
+        pass
+
+    def obs_data_release(self, data_p):
+        pass
+
+    def obs_data_array_count(self, array_p):
+        return len(obs.handles[array_p])
+
+    def obs_data_array_item(self, array_p, ind):
+        return obs.handle(obs.Data(obs.handles[array_p][ind]))
+
+    def obs_data_array_release(self, array_p):
+        obs.handles.pop(array_p, None)
+
+
+def load_script(path=script_path):
+    """ Imports adv-ff with the fake libraries, returns the module
+    """
+    fake = FakeLib()
+    cdll, find_library = ct.CDLL, ct.util.find_library
+    ct.CDLL = lambda *args, **kwargs: fake
+    ct.util.find_library = lambda name: name
+    try:
+        spec = importlib.util.spec_from_file_location("adv_ff", path)
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+    finally:
+        ct.CDLL, ct.util.find_library = cdll, find_library
+    return module
@@ -0,0 +1,24 @@
+"""
+The valid_formatted_length adv-ff used before the filename length got searched by bisection, kept as the reference
+the new one is benchmarked against. Copied from the original script, only taking the script module as first argument.
+
+    import linear_length
+    linear_length.valid_formatted_length(script, file_format)
+"""
+
+import ctypes as ct
+
+
+def valid_formatted_length(script, file_format):
+    available_length = 255 - 10             # We assume no extension will ever be more than 10 bytes
+
+    formatted_p = script._os_generate_formatted_filename("".encode("utf-8"), False, file_format.encode("utf-8"))
+    value       = ct.c_char_p(formatted_p).value
+    script._bfree(formatted_p)
+
+    while len(value) > available_length:
+        file_format = file_format[:-1]
+        formatted_p = script._os_generate_formatted_filename("".encode("utf-8"), False, file_format.encode("utf-8"))
+        value       = ct.c_char_p(formatted_p).value
+        script._bfree(formatted_p)
+    return len(file_format)
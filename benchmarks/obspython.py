@@ -0,0 +1,424 @@
+"""
+Stand-in for the obspython module, allowing adv-ff to be imported and benchmarked outside of OBS.
+
+Only implements what adv-ff calls, with plain python objects in place of OBS's.
+The scene collection is built with `populate()`.
+"""
+
+import json
+
+
+OBS_TEXT_DEFAULT        = 0
+OBS_TEXT_INFO           = 3
+OBS_TEXT_INFO_NORMAL    = 0
+OBS_TEXT_INFO_WARNING   = 1
+OBS_TEXT_INFO_ERROR     = 2
+
+OBS_COMBO_TYPE_LIST     = 1
+OBS_COMBO_FORMAT_STRING = 3
+OBS_EDITABLE_LIST_TYPE_STRINGS = 0
+
+OBS_DATA_NULL, OBS_DATA_STRING, OBS_DATA_NUMBER, OBS_DATA_BOOLEAN, OBS_DATA_OBJECT, OBS_DATA_ARRAY = range(6)
+OBS_DATA_NUM_INVALID, OBS_DATA_NUM_INT, OBS_DATA_NUM_DOUBLE = range(3)
+
+(OBS_FRONTEND_EVENT_RECORDING_STARTING,
+ OBS_FRONTEND_EVENT_RECORDING_STARTED,
+ OBS_FRONTEND_EVENT_RECORDING_STOPPING,
+ OBS_FRONTEND_EVENT_RECORDING_STOPPED,
+ OBS_FRONTEND_EVENT_REPLAY_BUFFER_STARTED,
+ OBS_FRONTEND_EVENT_REPLAY_BUFFER_STOPPING,
+ OBS_FRONTEND_EVENT_SCENE_CHANGED,
+ OBS_FRONTEND_EVENT_PREVIEW_SCENE_CHANGED,
+ OBS_FRONTEND_EVENT_STUDIO_MODE_ENABLED,
+ OBS_FRONTEND_EVENT_STUDIO_MODE_DISABLED,
+ OBS_FRONTEND_EVENT_SCENE_LIST_CHANGED,
+ OBS_FRONTEND_EVENT_FINISHED_LOADING,
+ OBS_FRONTEND_EVENT_SCENE_COLLECTION_CHANGING,
+ OBS_FRONTEND_EVENT_SCENE_COLLECTION_CHANGED,
+ OBS_FRONTEND_EVENT_EXIT) = range(15)
+
+
+class Stats():
+    """ Counts the calls made into the fake OBS API
+    """
+    calls = 0
+
+stats = Stats()
+
+
+#### Handles
+###################################################################################################
+
+handles = {}
+
+def handle(obj):
+    """ Registers an object and returns the integer standing for its pointer
+    """
+    handles[id(obj)] = obj
+    return id(obj)
+
+
+class Data():
+    """ obs_data, backed by a dict
+    """
+    def __init__(self, values=None):
+        self.values = values if values is not None else {}
+
+    def __int__(self):
+        return handle(self)
+
+
+class SignalHandler():
+    def __init__(self):
+        self.signals = {}
+
+    def emit(self, signal, **calldata):
+        for callback in list(self.signals.get(signal, [])):
+            callback(calldata)
+
+
+class Source():
+    """ obs_source, with its settings, procs and signals
+    """
+    def __init__(self, name, source_id, settings=None, procs=None):
+        self.name       = name
+        self.source_id  = source_id
+        self.settings   = Data(settings)
+        self.procs      = procs or {}
+        self.signals    = SignalHandler()
+        self.width      = 1920
+        self.height     = 1080
+        self.muted      = False
+        self.active     = True
+        self.showing    = True
+
+
+class Output():
+    """ obs_output, only its settings and signals are used
+    """
+    def __init__(self, settings=None):
+        self.settings   = Data(settings)
+        self.signals    = SignalHandler()
+
+
+class Frontend():
+    """ State of the frontend: sources, scenes, global procs and profile config
+    """
+    sources         = {}
+    scene           = None
+    preview         = None
+    procs           = {}
+    config          = {}
+    callbacks       = []
+    timers          = []
+    signals         = SignalHandler()
+    outputs         = {}
+    recording       = Output()
+    replay_buffer   = Output()
+
+frontend = Frontend()
+
+
+def populate(sources=8, settings=32, advss=16, scenes=4):
+    """ Builds a scene collection with the given number of sources, settings keys per source,
+        adv-ss variables and scenes
+    """
+    frontend.sources.clear()
+    frontend.procs.clear()
+
+    for ind in range(sources):
+        values = {f"key_{key}": f"value {key} of source {ind}" for key in range(settings)}
+        values.update({"number": ind, "ratio": ind / 3, "enabled": bool(ind % 2),
+                       "nested": {"list": [{"value": ind}, {"value": ind + 1}], "name": f"nested {ind}"},
+                       "playlist": [{"value": f"/path/to/file_{ind}_{item}.mkv"} for item in range(4)]})
+
+        title = f"Window title {ind}"
+        procs = {"get_hooked": lambda cd, title=title: cd.update(hooked=True, title=title, executable="game.exe",
+                                                                 **{"class": "GameWindow"})}
+        source_id = ("game_capture", "window_capture", "text_ft2_source", "vlc_source")[ind % 4]
+        name = f"Source {ind}"
+        frontend.sources[name] = Source(name, source_id, values, procs)
+
+    variables = {f"variable_{ind}": f"value {ind}" for ind in range(advss)}
+
+    def advss_get_variable_value(cd):
+        if cd["name"] in variables:
+            cd.update(value=variables[cd["name"]], success=True)
+
+    frontend.procs["advss_get_variable_value"] = advss_get_variable_value
+
+    scene_sources = [Source(f"Scene {ind}", "scene") for ind in range(max(scenes, 1))]
+    frontend.scene = scene_sources[0]
+    frontend.preview = scene_sources[-1] if scenes > 1 else None
+
+    frontend.config.update({("Output", "Mode"): "Advanced",
+                            ("Output", "FilenameFormatting"): "%CCYY-%MM-%DD %hh-%mm-%ss",
+                            ("AdvOut", "RecSplitFile"): False,
+                            ("AdvOut", "RecSplitFileType"): "Time",
+                            ("AdvOut", "RecSplitFileTime"): 15,
+                            ("AdvOut", "RecSplitFileSize"): 2048})
+
+
+#### Core
+###################################################################################################
+
+def obs_get_version():
+    return (31 << 24) | (1 << 16)
+
+def obs_get_source_by_name(name):
+    stats.calls += 1
+    return frontend.sources.get(name)
+
+def obs_source_release(source):
+    pass
+
+def obs_source_get_weak_source(source):
+    return source
+
+def obs_weak_source_get_source(weak):
+    return weak if frontend.sources.get(weak.name) is weak else None
+
+def obs_weak_source_release(weak):
+    pass
+
+def obs_source_get_name(source):
+    return source.name if source else None
+
+def obs_source_get_id(source):
+    return source.source_id
+
+def obs_source_get_unversioned_id(source):
+    return source.source_id
+
+def obs_source_get_settings(source):
+    stats.calls += 1
+    return source.settings
+
+def obs_source_get_width(source):
+    stats.calls += 1
+    return source.width
+
+def obs_source_get_height(source):
+    stats.calls += 1
+    return source.height
+
+def obs_source_muted(source):
+    stats.calls += 1
+    return source.muted
+
+def obs_source_active(source):
+    stats.calls += 1
+    return source.active
+
+def obs_source_showing(source):
+    stats.calls += 1
+    return source.showing
+
+def obs_source_get_signal_handler(source):
+    return source.signals
+
+def obs_source_get_proc_handler(source):
+    return source
+
+def obs_get_proc_handler():
+    return frontend
+
+def obs_get_signal_handler():
+    return frontend.signals
+
+
+#### Data
+###################################################################################################
+
+def obs_data_create():
+    return Data()
+
+def obs_data_create_from_json(string):
+    return Data(json.loads(string))
+
+def obs_data_release(data):
+    pass
+
+def obs_data_get_json(data):
+    return json.dumps(data.values)
+
+def obs_data_get_json_with_defaults(data):
+    stats.calls += 1
+    return json.dumps(data.values)
+
+def obs_data_get_string(data, name):
+    return data.values.get(name, "")
+
+def obs_data_get_int(data, name):
+    return data.values.get(name, 0)
+
+def obs_data_get_bool(data, name):
+    return data.values.get(name, False)
+
+def obs_data_get_default_obj(data, name):
+    return Data(data.values.get(name))
+
+def obs_data_set_string(data, name, value):
+    data.values[name] = value
+
+obs_data_set_int = obs_data_set_string
+obs_data_set_default_string = obs_data_set_string
+obs_data_set_default_int = obs_data_set_string
+obs_data_set_default_bool = obs_data_set_string
+
+def obs_data_set_obj(data, name, value):
+    data.values[name] = value.values
+
+def obs_data_get_array(data, name):
+    return [Data(item) for item in data.values.get(name, [])]
+
+def obs_data_array_count(array):
+    return len(array)
+
+def obs_data_array_item(array, ind):
+    return array[ind]
+
+def obs_data_array_release(array):
+    pass
+
+obs_data_set_default_obj = obs_data_set_obj
+obs_data_set_default_array = obs_data_set_obj
+
+
+#### Properties
+###################################################################################################
+
+# The UI isn't rendered, only the calls made by the callbacks are accepted
+
+def obs_properties_get(props, name):
+    return None
+
+def obs_property_list_clear(prop):
+    pass
+
+def obs_property_list_add_string(prop, name, value):
+    pass
+
+def obs_property_set_description(prop, description):
+    pass
+
+obs_property_set_long_description = obs_property_set_description
+obs_property_text_set_info_type = obs_property_set_description
+obs_property_set_visible = obs_property_set_description
+
+
+#### Calldata, signals and procedures
+###################################################################################################
+
+def calldata_create():
+    return {}
+
+def calldata_destroy(cd):
+    pass
+
+def calldata_set_string(cd, name, value):
+    cd[name] = value
+
+calldata_set_bool = calldata_set_string
+
+def calldata_string(cd, name):
+    value = cd.get(name)
+    return value if isinstance(value, str) else None
+
+def calldata_bool(cd, name):
+    return bool(cd.get(name, False))
+
+def calldata_int(cd, name):
+    return int(cd.get(name, 0))
+
+def calldata_float(cd, name):
+    return float(cd.get(name, 0))
+
+def calldata_source(cd, name):
+    return cd.get(name)
+
+def proc_handler_call(handler, name, cd):
+    stats.calls += 1
+    if name in handler.procs:
+        handler.procs[name](cd)
+        return True
+    return False
+
+def signal_handler_connect(handler, signal, callback):
+    handler.signals.setdefault(signal, []).append(callback)
+
+def signal_handler_disconnect(handler, signal, callback):
+    try:
+        handler.signals.get(signal, []).remove(callback)
+    except ValueError:
+        pass
+
+
+#### Frontend
+###################################################################################################
+
+def obs_frontend_get_current_scene():
+    stats.calls += 1
+    return frontend.scene
+
+def obs_frontend_get_current_preview_scene():
+    stats.calls += 1
+    return frontend.preview
+
+def obs_frontend_get_current_scene_collection():
+    return "Benchmark"
+
+def obs_frontend_add_event_callback(callback):
+    frontend.callbacks.append(callback)
+
+def obs_frontend_remove_event_callback(callback):
+    frontend.callbacks.remove(callback)
+
+def obs_frontend_get_profile_config():
+    return frontend.config
+
+def obs_frontend_get_recording_output():
+    return frontend.recording
+
+def obs_frontend_get_replay_buffer_output():
+    return frontend.replay_buffer
+
+def obs_frontend_recording_split_file():
+    return True
+
+def obs_output_release(output):
+    pass
+
+def obs_get_output_by_name(name):
+    return frontend.outputs.get(name)
+
+def obs_output_get_weak_output(output):
+    return output
+
+def obs_weak_output_get_output(weak):
+    return weak if weak in frontend.outputs.values() else None
+
+def obs_weak_output_release(weak):
+    pass
+
+def obs_output_get_settings(output):
+    return output.settings
+
+def obs_output_get_signal_handler(output):
+    return output.signals
+
+def config_get_string(config, section, name):
+    return config.get((section, name))
+
+config_get_bool = config_get_string
+config_get_int = config_get_string
+
+def config_set_string(config, section, name, value):
+    config[(section, name)] = value
+
+def timer_add(callback, milliseconds):
+    frontend.timers.append(callback)
+
+def timer_remove(callback):
+    if callback in frontend.timers:
+        frontend.timers.remove(callback)
@@ -0,0 +1,135 @@
+"""
+Offline renderer of adv-ff formattings, run outside of OBS against the data snapshots the script captured.
+
+Snapshots are written by the script when `snapshot_capture_file` is set, one line per render.
+
+    python benchmarks/render.py snapshots.jsonl "v$title$ c$counter$"        renders against every snapshot
+    python benchmarks/render.py snapshots.jsonl fmt1 fmt2 -q                    only prints the throughput
+    python benchmarks/render.py snapshots.jsonl fmt --interpreter              renders with the original interpreter
+    python benchmarks/render.py snapshots.jsonl fmt --capture 5000             first captures 5000 renders
+                                                                                of the fake scene collection
+
+Each render starts from the counters captured along the snapshot, and leaves them unchanged.
+The OBS formatting specifiers (%CCYY, %hh...) are filled with the fixed values of the fake libobs.
+"""
+
+import argparse
+import contextlib
+import json
+import os.path
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+import obspython as obs
+import libobs
+import interpreter
+
+
+def capture(script, path, count):
+    """ Appends `count` renders of the fake scene collection to the snapshot file
+    """
+    obs.populate()
+    sources = list(obs.frontend.sources)
+    script.snapshot_capture_file = os.path.abspath(path)       # Absolute, so not joined to the config folder
+    script.render_deadline = 0
+    script.rec_parser_tree_from_string("c$counter$ v$title$ %CCYY-%MM-%DD %hh-%mm-%ss")
+    script.rec_parser.sources = sources
+    script.source_snapshots.clear()
+    script.source_snapshots.sync(set(sources))
+
+    for ind in range(count):
+        source = obs.frontend.sources[sources[ind % len(sources)]]
+        source.settings.values["number"] = ind
+        source.signals.emit("update", source=source)
+        script.rec_parser_interpret()
+    script.close_snapshot_capture()
+    script.snapshot_capture_file = ""
+    script.counters.data.clear()
+
+
+def load_snapshots(script, path):
+    """ Returns the data object and counters of each snapshot of the file, skipping the damaged lines
+    """
+    snapshots = []
+    with open(path, encoding="utf8") as file:
+        for number, line in enumerate(file, 1):
+            try:
+                snapshot = json.loads(line)
+                snapshots.append((script.snapshot_render_data(snapshot), snapshot["counters"]))
+            except (ValueError, KeyError, TypeError) as exc:
+                print(f"{path}:{number} : damaged snapshot ignored ({exc!r})", file=sys.stderr)
+    return snapshots
+
+
+def render_all(script, string, snapshots, use_interpreter, engine):
+    """ Renders the formatting against every snapshot, returns the filenames, error count and time taken
+    """
+    tree = script.fold_tree(script.parse_format(string, engine))
+    template = script.compile_tree(tree)
+    err_counter = script.ErrCounter()
+    filenames = []
+
+    start = time.perf_counter()
+    for data, counters in snapshots:
+        script.counters.data.clear()
+        script.counters.data.update(counters)
+        if use_interpreter:
+            file_format = interpreter.interpreter(script, tree, data, err_counter, increase_counters=False, sanitize=True)
+        else:
+            file_format = script.render_template(template, data, err_counter, increase_counters=False, sanitize=True)
+        filenames.append(file_format[:script.valid_formatted_length(file_format)])
+    elapsed = time.perf_counter() - start
+
+    return filenames, err_counter.counter, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Renders adv-ff formattings against captured data snapshots")
+    parser.add_argument("snapshots", help="snapshot file, as written with snapshot_capture_file")
+    parser.add_argument("formattings", nargs="+", help="formattings to render")
+    parser.add_argument("-q", dest="quiet", action="store_true", help="only print the throughput, not the filenames")
+    parser.add_argument("--interpreter", action="store_true", help="render with the original interpreter rather than the compiled template")
+    parser.add_argument("--engine", default="native", choices=("native", "pyparsing"), help="parser used to read the formattings")
+    parser.add_argument("--capture", type=int, default=0, help="first append this many renders of the fake scene collection")
+    args = parser.parse_args()
+
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        script = libobs.load_script()
+        if args.engine == "pyparsing":
+            script.load_pyparsing()
+        if args.capture:
+            capture(script, args.snapshots, args.capture)
+
+    snapshots = load_snapshots(script, args.snapshots)
+    if not snapshots:
+        print(f"No snapshot in {args.snapshots}")
+        sys.exit(1)
+    script.AdvssResolver.unavailable = True         # Variables the capture didn't resolve come out empty
+
+    failed = False
+    summaries = []
+    for string in args.formattings:
+        try:
+            with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):    # The script's own logging
+                filenames, errors, elapsed = render_all(script, string, snapshots, args.interpreter, args.engine)
+        except script.ParseError as exc:
+            print(f"{string!r} : parsing error, {exc}")
+            failed = True
+            continue
+
+        if not args.quiet:
+            print(f"{string!r}")
+            for ind, file_format in enumerate(filenames):
+                print(f"{ind:8}  {script.os_generate_formatted_filename('', True, file_format)}")
+        summaries.append(f"{string!r} : {len(filenames)} renders in {elapsed:.3f}s, "
+                         f"{len(filenames) / elapsed:,.0f} renders/s, {errors} errors")
+
+    for summary in summaries:
+        print(summary)
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
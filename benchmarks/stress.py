@@ -0,0 +1,190 @@
+"""
+Stress test of adv-ff's counters, run outside of OBS with the fake obspython and libobs.
+
+Hammers the three threads OBS calls the script from, all rendering with the same counter:
+    output thread   buf_parser_apply_cb on every replay buffer save, and the file_changed splits
+    hotkey thread   split_file_hotkey_callback
+    UI thread       rec_parser_apply_cb on recording start and stop, and the counters UI callbacks
+
+    python benchmarks/stress.py                 runs both the manual and the native split modes
+    python benchmarks/stress.py --renders 5000  renders per thread
+
+Checks that no value of the counter was handed out to two filenames that got used, and that every
+value up to the final one was used, given back or reported as skipped. Exits with status 1 otherwise.
+"""
+
+import argparse
+import collections
+import contextlib
+import os.path
+import re
+import sys
+import tempfile
+import threading
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+import obspython as obs
+import libobs
+
+
+template = "c$counter$ v$title$ %hh-%mm-%ss"
+counter_pattern = re.compile(r"^(\d+) ")
+
+
+class Renders():
+    """ Counter values of the filenames rendered, and of the prerendered ones rolled back
+    """
+    def __init__(self):
+        self.lock       = threading.Lock()
+        self.values     = []
+        self.rolled     = []
+
+
+def instrument(script, renders):
+    """ Records the counter value of every filename the script renders and of every rollback
+    """
+    def recorded(func):
+        def wrapper(*args, **kwargs):
+            filename = func(*args, **kwargs)
+            with renders.lock:
+                renders.values.append(int(counter_pattern.match(filename).group(1)))
+            return filename
+        return wrapper
+
+    script.rec_parser_interpret = recorded(script.rec_parser_interpret)
+    script.buf_parser_interpret = recorded(script.buf_parser_interpret)
+
+    rollback = script.CounterReservation.rollback
+
+    def reservation_rollback(reservation):
+        with renders.lock:
+            renders.rolled.extend(reservation.taken.get("counter", []))
+        rollback(reservation)
+    script.CounterReservation.rollback = reservation_rollback
+
+
+def setup(script, split_type, journal):
+    obs.populate()
+    sources = list(obs.frontend.sources)
+    obs.frontend.config.update({("AdvOut", "RecSplitFile"): True, ("AdvOut", "RecSplitFileType"): split_type})
+
+    script.rec_parser_tree_from_string(template)
+    script.buf_parser_tree_from_string(template)
+    script.rec_parser.sources = sources
+    script.buf_parser.sources = sources
+    script.source_snapshots.clear()
+    script.source_snapshots.sync(set(sources))
+    script.flags.record_enabled = True
+    script.flags.buffer_enabled = True
+
+    script.counters.data.clear()
+    script.counters.data["counter"] = 0
+    script.counters.selected = "counter"
+    script.counters.skipped = 0
+    script.settings_holder.settings = obs.obs_data_create()
+    script.show_counter(script.settings_holder.settings)
+
+    script.counter_journal_file = journal
+    script.compact_counter_journal()
+
+    # The overridden OBS split, completed right away
+    script.split_file.hotkey.oldfunc = lambda *args: script.split_file_done_callback()
+    script.split_file.split_pending = False
+
+
+def run(script, split_type, count, journal):
+    """ Runs the threads with the given split type, returns the list of errors found
+    """
+    setup(script, split_type, journal)
+    renders = Renders()
+    instrument(script, renders)
+    settings = script.settings_holder.settings
+
+    recording = threading.Event()
+    splitting = threading.Lock()        # OBS never splits a file once the recording is stopping
+    done = threading.Event()
+
+    def output_thread():
+        for ind in range(count):
+            script.buf_parser_apply_cb({})
+            if split_type != "Manual" and ind % 4 == 0:
+                with splitting:
+                    if recording.is_set():
+                        obs.frontend.recording.signals.emit("file_changed")
+
+    def hotkey_thread():
+        for _ in range(count):
+            script.split_file_hotkey_callback(0, None, True)
+
+    def ui_thread():
+        while not done.is_set():
+            script.rec_parser_apply_cb(obs.OBS_FRONTEND_EVENT_RECORDING_STARTING)
+            script.rec_parser_apply_cb(obs.OBS_FRONTEND_EVENT_RECORDING_STARTED)
+            recording.set()
+            for _ in range(4):
+                script.refresh_counters(None, None)
+                script.rec_tester(None)
+                script.counter_value_modified(None, None, settings)
+            with splitting:
+                recording.clear()
+            script.rec_parser_apply_cb(obs.OBS_FRONTEND_EVENT_RECORDING_STOPPING)
+            script.rec_parser_apply_cb(obs.OBS_FRONTEND_EVENT_RECORDING_STOPPED)
+
+    workers = [threading.Thread(target=output_thread), threading.Thread(target=hotkey_thread)]
+    ui = threading.Thread(target=ui_thread)
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):     # The script's own logging
+        for thread in workers + [ui]:
+            thread.start()
+        for thread in workers:
+            thread.join()
+        done.set()
+        ui.join()
+        script.sync_counter_journal()
+
+    used = collections.Counter(renders.values)
+    used.subtract(renders.rolled)
+    final = script.counters.data["counter"]
+
+    errors = []
+    duplicates = sorted(value for value, times in used.items() if times > 1)
+    if duplicates:
+        errors.append(f"{len(duplicates)} values used more than once : {duplicates[:10]}")
+    if any(times < 0 for times in used.values()):
+        errors.append("values rolled back that were never rendered")
+    unused = final - sum(1 for times in used.values() if times > 0) - script.counters.skipped
+    if unused:
+        errors.append(f"{unused} values neither used, given back nor skipped, final value {final}")
+    if any(value >= final for value, times in used.items() if times > 0):
+        errors.append(f"values used beyond the final value {final}")
+
+    script.counters.data.clear()
+    script.replay_counter_journal()
+    if script.counters.data.get("counter") != final:
+        errors.append(f"journal replays to {script.counters.data.get('counter')} instead of {final}")
+
+    print(f"{split_type:<8} {len(renders.values):6} renders, {len(renders.rolled):4} rolled back, "
+          f"{script.counters.skipped:4} skipped, final value {final}" + ("" if errors else "   OK"))
+    return errors
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Stress test of adv-ff's counters across threads")
+    parser.add_argument("--renders", type=int, default=2000, help="renders per thread")
+    parser.add_argument("--switch", type=float, default=1e-6, help="thread switch interval in seconds")
+    args = parser.parse_args()
+
+    sys.setswitchinterval(args.switch)
+    failed = False
+    with tempfile.TemporaryDirectory() as folder:
+        for split_type in ("Manual", "Time"):
+            script = libobs.load_script()
+            for error in run(script, split_type, args.renders, os.path.join(folder, f"{split_type}.journal")):
+                print(f"    {error}")
+                failed = True
+
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()